@@ -1,9 +1,21 @@
+import chess_to_the_death.parser.argparser as argparser
 from chess_to_the_death.parser.argparser import ArgsHandler
-from chess_to_the_death.util.gui import mainGUI
 
 if __name__ == '__main__':
     try:
         ArgsHandler(__file__)
-        mainGUI()
+        # perft and simulations run headless, so pygame is only imported for the gui
+        if argparser.PERFT_DEPTH or argparser.PERFT_SUITE:
+            from chess_to_the_death.util.perft import mainPerft
+            mainPerft()
+        elif argparser.TUNE_CANDIDATES:
+            from chess_to_the_death.util.tuner import mainTuner
+            mainTuner()
+        elif argparser.SIMULATE_GAMES:
+            from chess_to_the_death.util.simulator import mainSimulator
+            mainSimulator()
+        else:
+            from chess_to_the_death.util.gui import mainGUI
+            mainGUI()
     except KeyboardInterrupt:
-        print("GoodBye!")
+        print("GoodBye!")
\ No newline at end of file
@@ -1,25 +1,105 @@
-from chess_to_the_death.util.loader import loadImage
 from chess_to_the_death.util.definition import PieceChar
 
+
+# the move tables only depend on the board dimension, so every
+# piece on a board of the same size shares them.
+_PIECE_TABLES = {}
+
+
+class PieceTables:
+    def __init__(self, dimension: tuple):
+        """
+        the cells reachable from every cell of a board with the shape 'dimension'
+        (height, width), indexed by 'y * width + x'. The tables of a set of offsets
+        or directions are computed once, when they are first asked for.
+        """
+        self.height, self.width = dimension
+        self.leaps = {}
+        self.rays = {}
+
+    def _inBounds(self, x: int, y: int) -> bool:
+        return (0 <= x < self.width) and (0 <= y < self.height)
+
+    def getLeaps(self, offsets: tuple) -> list:
+        """
+        returns the cells (x, y) reached with the 'offsets' (dx, dy) from every cell.
+        """
+        if offsets not in self.leaps:
+            self.leaps[offsets] = [[(x + dx, y + dy) for dx, dy in offsets if self._inBounds(x + dx, y + dy)]
+                                   for y in range(self.height) for x in range(self.width)]
+        return self.leaps[offsets]
+
+    def getRays(self, directions: tuple) -> list:
+        """
+        returns the rays of cells (x, y) along the 'directions' (dx, dy) from every cell,
+        each ordered by the distance and without the empty rays at the edge of the board.
+        """
+        if directions not in self.rays:
+            table = []
+            for y in range(self.height):
+                for x in range(self.width):
+                    rays = []
+                    for dx, dy in directions:
+                        ray, i = [], 1
+                        while self._inBounds(x + i * dx, y + i * dy):
+                            ray.append((x + i * dx, y + i * dy))
+                            i += 1
+                        if ray:
+                            rays.append(ray)
+                    table.append(rays)
+            self.rays[directions] = table
+        return self.rays[directions]
+
+
+def getPieceTables(dimension: tuple) -> PieceTables:
+    """
+    return the (cached) PieceTables for the board dimension (height, width).
+    """
+    if dimension not in _PIECE_TABLES:
+        _PIECE_TABLES[dimension] = PieceTables(dimension)
+    return _PIECE_TABLES[dimension]
+
+
+def flipOffsets(offsets: tuple) -> tuple:
+    """
+    mirror the 'offsets' (dx, dy) for a piece walking downwards.
+    """
+    return tuple((-dx, -dy) for dx, dy in offsets)
+
+
 class Piece:
+    # a piece only holds its own state, everything else is data of its type
+    # (see PieceStore for the pieces of a position as arrays)
+    __slots__ = ('cell_col', 'cell_row', '_player', 'health', 'maxHealth', 'damage', 'firstMove')
+    # a type of piece is described by the following data alone,
+    # Piece.getOptions uses it for every type of piece
     _name = PieceChar.UNDEFINED
-    
-    def __init__(self, cell_pos: tuple, player: str, image_size: tuple = None):
+    # the health and damage every piece of this type starts with
+    default_health = 1
+    default_damage = 1
+    # offsets (dx, dy) the piece jumps to, to move or to attack
+    leaps = ()
+    # directions (dx, dy) the piece slides along, until the first occupied cell
+    slides = ()
+    # offsets the piece only attacks and directions the piece only moves along (e.g. the pawn).
+    # both are mirrored for a piece walking downwards (see GameState.pawnFlip)
+    attack_leaps = ()
+    pushes = ()
+    # the number of cells a push covers on the first move and on every other move
+    first_push_range = 1
+    push_range = 1
+
+    def __init__(self, cell_pos: tuple, player: str):
         self.setPos(cell_pos)
         self._player = player
-        
+        self.maxHealth = self.health = self.default_health
+        self.damage = self.default_damage
+
         self.firstMove = True
-        self.loadImage(image_size)
 
-    def loadImage(self, image_size: tuple = None) -> None:
-        """
-        load the image to diplay the piece
-        """
-        self.image = loadImage(self._player + self._name, image_size)
-        
     def getPos(self) -> tuple:
         return (self.cell_col, self.cell_row)
-    
+
     def setPos(self, to_pos: tuple) -> None:
         self.cell_col, self.cell_row = to_pos
 
@@ -37,167 +117,99 @@ class Piece:
         """
         return ((board[y, x] * board[self.cell_row, self.cell_col]) < 0)
 
-    def getOptions(self, _, __: bool = True) -> tuple:
+    def getOptions(self, board, flip: bool = False) -> tuple:
         """
         Takes a numpy-array board and returns a tuple containing
         two lists. The lists contain tuples of valid movement-moves
-        and valid attack-moves.
+        and valid attack-moves. If 'flip' the piece walks downwards.
         """
-        return ([], [])
-    
-    def __repr__(self) -> str:
-        return self._player + self._name + " (" + hex(id(self)) + ")"
-
-
-class Rook(Piece):
-    _name = PieceChar.ROOK
-    
-    def __init__(self, cell_pos, player, image_size=None):
-        super().__init__(cell_pos, player, image_size)
-        self.maxHealth = self.health = 90
-        self.damage = 15
-
-    def getOptions(self, board, _=True):
         options_move, options_attack = [], []
-        options = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for option in options:
-            for i in range(1, max(board.shape[0], board.shape[1])):
-                x, y = self.cell_col + i * \
-                    option[0], self.cell_row + i * option[1]
-                if not ((0 <= y < board.shape[0]) and (
-                        0 <= x < board.shape[1])):
-                    break
+        tables = getPieceTables(board.shape)
+        idx = self.cell_row * board.shape[1] + self.cell_col
+        own = board[self.cell_row, self.cell_col]
+        attack_leaps, pushes = self.attack_leaps, self.pushes
+        if flip:
+            attack_leaps, pushes = flipOffsets(attack_leaps), flipOffsets(pushes)
+
+        for x, y in tables.getLeaps(attack_leaps)[idx]:
+            if board[y, x] * own < 0:
+                options_attack.append((x, y))
+        for x, y in tables.getLeaps(self.leaps)[idx]:
+            if board[y, x] * own < 0:
+                options_attack.append((x, y))
+            elif board[y, x] == 0:
+                options_move.append((x, y))
+        for ray in tables.getRays(self.slides)[idx]:
+            for x, y in ray:
                 if board[y, x] != 0:
-                    if super().isEnemy(x, y, board):
+                    if board[y, x] * own < 0:
                         options_attack.append((x, y))
                     break
                 options_move.append((x, y))
+        push_range = self.first_push_range if self.firstMove else self.push_range
+        for ray in tables.getRays(pushes)[idx]:
+            for x, y in ray[:push_range]:
+                if board[y, x] != 0:
+                    break
+                options_move.append((x, y))
 
         return (options_move, options_attack)
 
+    def __repr__(self) -> str:
+        return self._player + self._name + " (" + hex(id(self)) + ")"
 
-class Knight(Piece):
-    _name = PieceChar.KNIGHT
-    
-    def __init__(self, cell_pos, player, image_size=None):
-        super().__init__(cell_pos, player, image_size)
-        self.maxHealth = self.health = 32
-        self.damage = 45
 
-    def getOptions(self, board, _=True):
-        options_move, options_attack = [], []
-        options = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                   (1, -2), (1, 2), (2, -1), (2, 1)]
-        for option in options:
-            x, y = self.cell_col + option[0], self.cell_row + option[1]
-            if not ((0 <= x < board.shape[1]) and (
-                    0 <= y < board.shape[0])):
-                continue
-            if super().isEnemy(x, y, board):
-                options_attack.append((x, y))
-                continue
-            if board[y, x] == 0:
-                options_move.append((x, y))
+class Rook(Piece):
+    __slots__ = ()
+    _name = PieceChar.ROOK
+    default_health = 90
+    default_damage = 15
+    slides = ((-1, 0), (1, 0), (0, -1), (0, 1))
 
-        return (options_move, options_attack)
+
+class Knight(Piece):
+    __slots__ = ()
+    _name = PieceChar.KNIGHT
+    default_health = 32
+    default_damage = 45
+    leaps = ((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+             (1, -2), (1, 2), (2, -1), (2, 1))
 
 
 class Bishop(Piece):
+    __slots__ = ()
     _name = PieceChar.BISHOP
-    
-    def __init__(self, cell_pos, player, image_size=None):
-        super().__init__(cell_pos, player, image_size)
-        self.maxHealth = self.health = 45
-        self.damage = 32
-
-    def getOptions(self, board, _=True):
-        options_move, options_attack = [], []
-        options = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        for option in options:
-            for i in range(1, max(board.shape[0], board.shape[1])):
-                x, y = self.cell_col + i * \
-                    option[0], self.cell_row + i * option[1]
-                if not ((0 <= x < board.shape[1]) and (
-                        0 <= y < board.shape[0])):
-                    break
-                if board[y, x] != 0:
-                    if super().isEnemy(x, y, board):
-                        options_attack.append((x, y))
-                    break
-                options_move.append((x, y))
-
-        return (options_move, options_attack)
+    default_health = 45
+    default_damage = 32
+    slides = ((-1, -1), (-1, 1), (1, -1), (1, 1))
 
 
 class Pawn(Piece):
+    __slots__ = ()
     _name = PieceChar.PAWN
-    
-    def __init__(self, cell_pos, player, image_size=None):
-        super().__init__(cell_pos, player, image_size)
-        self.maxHealth = self.health = 120
-        self.damage = 120
-
-    def getOptions(self, board, flip=False):
-        options_move, options_attack = [], []
-        options_m, options_a = [(0, -1), (0, -2)], [(-1, -1), (1, -1)]
-        if flip:
-            options_a = [(-x, -y) for x,y in options_a]
-            options_m = [(-x, -y) for x,y in options_m]
-        for option_a in options_a:
-            x, y = self.cell_col + option_a[0], self.cell_row + option_a[1]
-            if not ((0 <= x < board.shape[1]) and (
-                    0 <= y < board.shape[0])):
-                continue
-            if super().isEnemy(x, y, board):
-                options_attack.append((x, y))
-        
-        if 0 <= self.cell_row+options_m[0][1] < board.shape[0]:
-            if board[self.cell_row+options_m[0][1], self.cell_col] == 0:
-                options_move.append((self.cell_col, self.cell_row+options_m[0][1]))
-                if 0 <= self.cell_row+options_m[1][1] < board.shape[0] and self.firstMove:
-                    if board[self.cell_row+options_m[1][1], self.cell_col] == 0:
-                        options_move.append((self.cell_col, self.cell_row+options_m[1][1]))
-
-        return (options_move, options_attack)
+    default_health = 120
+    default_damage = 120
+    attack_leaps = ((-1, -1), (1, -1))
+    pushes = ((0, -1),)
+    first_push_range = 2
 
 
 class Queen(Piece):
+    __slots__ = ()
     _name = PieceChar.QUEEN
-    
-    def __init__(self, cell_pos, player, image_size=None):
-        super().__init__(cell_pos, player, image_size)
-        self.maxHealth = self.health = 10
-        self.damage = 60
-
-    def getOptions(self, board, _=True):
-        return tuple([a+b for a,b in \
-            list(zip(
-                Bishop(self.getPos(), self._player, None).getOptions(board),
-                Rook(self.getPos(), self._player, None).getOptions(board)
-            ))])
+    default_health = 10
+    default_damage = 60
+    slides = Bishop.slides + Rook.slides
 
 
 class King(Piece):
+    __slots__ = ()
     _name = PieceChar.KING
-    
-    def __init__(self, cell_pos, player, image_size=None):
-        super().__init__(cell_pos, player, image_size)
-        self.maxHealth = self.health = 150
-        self.damage = 35
+    default_health = 150
+    default_damage = 35
+    leaps = ((-1, -1), (-1, 0), (-1, 1), (0, -1),
+             (0, 1), (1, -1), (1, 0), (1, 1))
 
-    def getOptions(self, board, _=True):
-        options_move, options_attack = [], []
-        options = [(-1, -1), (-1, 0), (-1, 1), (0, -1),
-                   (0, 1), (1, -1), (1, 0), (1, 1)]
-        for option in options:
-            x, y = self.cell_col + option[0], self.cell_row + option[1]
-            if not ((0 <= x < board.shape[1]) and (
-                    0 <= y < board.shape[0])):
-                continue
-            if super().isEnemy(x, y, board):
-                options_attack.append((x, y))
-                continue
-            if board[y, x] == 0:
-                options_move.append((x, y))
 
-        return (options_move, options_attack)
+# the piece types by their char identifier (see createPiece), new piece types are added here
+PIECE_TYPES = {pieceType._name: pieceType for pieceType in (Pawn, Bishop, Knight, Rook, Queen, King)}
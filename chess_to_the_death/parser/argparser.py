@@ -1,7 +1,7 @@
 import argparse
 from sys import exit as sysexit
 from datetime import datetime
-from os import path
+from os import path, cpu_count
 import chess_to_the_death.util.config as config
 from chess_to_the_death.web.UpdateChecker import printUpdateInformation
 from chess_to_the_death import __version__, __sysversion__, __author__
@@ -13,6 +13,24 @@ RANDOM_VALUES = False
 DEFAULT_MODE = False
 CRAZY_MODE = False
 STARTING_POSITION = None
+DEBUG_MODE = False
+# the policies of util/policy.py, which can play simulated games
+POLICY_NAMES = ['random', 'greedy', 'search']
+PERFT_DEPTH = 0
+PERFT_DIVIDE = False
+PERFT_SUITE = False
+SIMULATE_GAMES = 0
+WHITE_POLICY = 'random'
+BLACK_POLICY = 'random'
+PROCESSES = cpu_count() or 1
+SEED = 0
+MAX_PLIES = 500
+RESULTS_FILE = 'results.jsonl'
+TUNE_CANDIDATES = 0
+TUNE_GAMES = 1000
+AI_PLAYER = None
+AI_DEPTH = 4
+AI_TIME = 2.0
 
 class ArgsHandler:
     params: argparse.Namespace = None
@@ -44,6 +62,38 @@ class ArgsHandler:
                             const=True, help="play the crazyhouse chess variant")
         parser.add_argument("-pos", action="store", default=None, dest="position",
                             help="FEN starting position")
+        parser.add_argument("-debug", action="store_const", default=False, dest="debug",
+                            const=True, help="check the incremental board against full rebuilds")
+        parser.add_argument("-perft", action="store", default=0, type=int, dest="perft", metavar="DEPTH",
+                            help="count the reachable positions up to DEPTH turns instead of playing")
+        parser.add_argument("-divide", action="store_const", default=False, dest="divide",
+                            const=True, help="list the perft count of every first turn")
+        parser.add_argument("-perftsuite", action="store_const", default=False, dest="perftsuite",
+                            const=True, help="compare perft of all stored positions to their reference counts")
+        parser.add_argument("-simulate", action="store", default=0, type=int, dest="simulate", metavar="GAMES",
+                            help="play GAMES games headless instead of starting the gui")
+        parser.add_argument("-white", action="store", default='random', dest="white", choices=POLICY_NAMES,
+                            help="the policy of white in simulated games")
+        parser.add_argument("-black", action="store", default='random', dest="black", choices=POLICY_NAMES,
+                            help="the policy of black in simulated games")
+        parser.add_argument("-processes", action="store", default=cpu_count() or 1, type=int, dest="processes",
+                            help="the number of processes to simulate games with")
+        parser.add_argument("-seed", action="store", default=0, type=int, dest="seed",
+                            help="the seed of the first simulated game")
+        parser.add_argument("-maxplies", action="store", default=500, type=int, dest="maxplies",
+                            help="the maximum number of turns of a simulated game")
+        parser.add_argument("-results", action="store", default='results.jsonl', dest="results", metavar="FILE",
+                            help="the file the results of simulated games are appended to")
+        parser.add_argument("-tune", action="store", default=0, type=int, dest="tune", metavar="CANDIDATES",
+                            help="search balanced health- and damage values by trying CANDIDATES variations")
+        parser.add_argument("-tunegames", action="store", default=1000, type=int, dest="tunegames", metavar="GAMES",
+                            help="the number of simulated games per tuner candidate")
+        parser.add_argument("-ai", action="store", default=None, dest="ai", choices=['white', 'black'],
+                            help="let the computer play white or black")
+        parser.add_argument("-aidepth", action="store", default=4, type=int, dest="aidepth", metavar="DEPTH",
+                            help="the maximum number of turns the computer searches ahead")
+        parser.add_argument("-aitime", action="store", default=2.0, type=float, dest="aitime", metavar="SECONDS",
+                            help="the time the computer may search a turn for (0 for no limit)")
         
         self.params = parser.parse_args()
     
@@ -55,6 +105,22 @@ class ArgsHandler:
         global DEFAULT_MODE
         global CRAZY_MODE
         global STARTING_POSITION
+        global DEBUG_MODE
+        global PERFT_DEPTH
+        global PERFT_DIVIDE
+        global PERFT_SUITE
+        global SIMULATE_GAMES
+        global WHITE_POLICY
+        global BLACK_POLICY
+        global PROCESSES
+        global SEED
+        global MAX_PLIES
+        global RESULTS_FILE
+        global TUNE_CANDIDATES
+        global TUNE_GAMES
+        global AI_PLAYER
+        global AI_DEPTH
+        global AI_TIME
         if getattr(self.params, 'version'):
             self._showVersion()
             sysexit(0)
@@ -65,6 +131,22 @@ class ArgsHandler:
         DEFAULT_MODE = getattr(self.params, 'default')
         CRAZY_MODE = getattr(self.params, 'crazy')
         STARTING_POSITION = getattr(self.params, 'position')
+        DEBUG_MODE = getattr(self.params, 'debug')
+        PERFT_DEPTH = getattr(self.params, 'perft')
+        PERFT_DIVIDE = getattr(self.params, 'divide')
+        PERFT_SUITE = getattr(self.params, 'perftsuite')
+        SIMULATE_GAMES = getattr(self.params, 'simulate')
+        WHITE_POLICY = getattr(self.params, 'white')
+        BLACK_POLICY = getattr(self.params, 'black')
+        PROCESSES = getattr(self.params, 'processes')
+        SEED = getattr(self.params, 'seed')
+        MAX_PLIES = getattr(self.params, 'maxplies')
+        RESULTS_FILE = getattr(self.params, 'results')
+        TUNE_CANDIDATES = getattr(self.params, 'tune')
+        TUNE_GAMES = getattr(self.params, 'tunegames')
+        AI_PLAYER = getattr(self.params, 'ai')
+        AI_DEPTH = getattr(self.params, 'aidepth')
+        AI_TIME = getattr(self.params, 'aitime')
         config.generateBoardFromFEN(STARTING_POSITION, CRAZY_MODE)
         
     def _showVersion(self) -> None:
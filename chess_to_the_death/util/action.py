@@ -1,42 +1,183 @@
 import numpy as np
+from array import array
+
+import chess_to_the_death.util.config as config
+from chess_to_the_death.entity.pieces import Piece
 
 class Action:
-    def __init__(self, from_col: str, from_row: str, to_col: str, to_row: str, action: str, pieceName: str) -> None:
+    def __init__(self, from_pos: tuple, to_pos: tuple, action: str, pieceName: str, damage: int = 0) -> None:
         """
-        from_col and to_col expect a char like 'A', 'B', ...
-        from_row and to_row expect a char like '1', '2', ...
+        from_pos and to_pos expect a position (x, y) on the board
+        damage is the amount of healthpoints taken by an attack
         """
-        self.from_col = from_col
-        self.from_row = from_row
-        self.to_col = to_col
-        self.to_row = to_row
+        self.from_pos = from_pos
+        self.to_pos = to_pos
         self.action = action
         self.pieceName = pieceName
+        self.damage = damage
+
+    @staticmethod
+    def getCellRepr(pos: tuple) -> str:
+        """
+        returns the identifier of a cell on the board (e.g. 'C1')
+        """
+        return chr(65 + pos[0]) + str(config.DIMENSION[0] - pos[1])
         
     def __repr__(self) -> str:
-        return self.from_col + self.from_row + '-' + self.to_col + self.to_row + ' ' + self.action + ' ' + self.pieceName
+        return self.getCellRepr(self.from_pos) + '-' + self.getCellRepr(self.to_pos) + ' ' + \
+            self.action + ' ' + self.pieceName
 
 class ActionLog:
+    # the board is stored completely after every KEYFRAME_INTERVAL actions,
+    # in between only the changed cells are stored
+    KEYFRAME_INTERVAL = 32
+    # the action names and piece names are stored as indices of these lists
+    # (shared by all logs, new names are appended)
+    NAMES = []
+    NAME_CODES = {}
+
+    # a move is stored as from_cell | to_cell << MOVE_SHIFT, with the cells
+    # indexed (y * width + x) on the board
+    MOVE_SHIFT = 16
+    MOVE_MASK = (1 << MOVE_SHIFT) - 1
+
     def __init__(self) -> None:
-        self.actions = []
-        self.boards = []
-    
-    def add(self, board: np.ndarray, from_col: str, from_row: str, to_col: str, to_row: str, action: str, pieceName: str) -> None:
+        self.moves = array('I')
+        self.action_codes = array('B')
+        self.piece_codes = array('B')
+        # the healthpoints taken by an attack
+        self.damages = array('i')
+        # the changes of the board, the changes of action i are
+        # stored between delta_offsets[i] and delta_offsets[i+1]
+        self.delta_offsets = array('I', [0])
+        self.delta_cells = array('I')
+        self.delta_old = array('b')
+        self.delta_new = array('b')
+        self.keyframes = []
+        self.last_board = None
+
+    @classmethod
+    def getNameCode(cls, name: str) -> int:
+        code = cls.NAME_CODES.get(name)
+        if code is None:
+            code = cls.NAME_CODES[name] = len(cls.NAMES)
+            cls.NAMES.append(name)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.action_codes)
+
+    def packMove(self, from_pos: tuple, to_pos: tuple) -> int:
         """
-        from_col and to_col expect a char like 'A', 'B', ...
-        from_row and to_row expect a char like '1', '2', ...
-        add an action to the log by saving the from- and to-position of the action taken aswell
-        as the entire board
+        returns the move from 'from_pos' to 'to_pos' as a single integer.
         """
-        self.boards.append(board.copy())
-        self.actions.append(Action(from_col, from_row, to_col, to_row, action, pieceName))
-        
+        width = config.DIMENSION[1]
+        return (from_pos[1] * width + from_pos[0]) | (to_pos[1] * width + to_pos[0]) << self.MOVE_SHIFT
+
+    def unpackMove(self, move: int) -> tuple:
+        """
+        returns the from- and to-position of a packed 'move'.
+        """
+        width = config.DIMENSION[1]
+        from_cell, to_cell = move & self.MOVE_MASK, move >> self.MOVE_SHIFT
+        return ((from_cell % width, from_cell // width), (to_cell % width, to_cell // width))
+
+    def add(self, board: np.ndarray, from_pos: tuple, to_pos: tuple, action: str,
+            pieceName: str, damage: int = 0) -> None:
+        """
+        add an action to the log by saving the from- and to-position (x, y) of the action taken
+        aswell as the changes of the board and the 'damage' dealt.
+        """
+        self.moves.append(self.packMove(from_pos, to_pos))
+        self.action_codes.append(self.getNameCode(action))
+        self.piece_codes.append(self.getNameCode(pieceName))
+        self.damages.append(damage)
+
+        if self.last_board is None:
+            self.last_board = board.copy()
+        else:
+            cells = np.flatnonzero(self.last_board != board)
+            self.delta_cells.extend(cells.tolist())
+            self.delta_old.extend(self.last_board.flat[cells].tolist())
+            self.delta_new.extend(board.flat[cells].tolist())
+            self.last_board.flat[cells] = board.flat[cells]
+        self.delta_offsets.append(len(self.delta_cells))
+        if (len(self) - 1) % self.KEYFRAME_INTERVAL == 0:
+            self.keyframes.append(self.last_board.copy())
+
+    def pop(self) -> Action:
+        """
+        remove and return the last action of the log
+        """
+        action = self.get(-1)
+        index = len(self) - 1
+        for values in (self.moves, self.action_codes, self.piece_codes, self.damages):
+            values.pop()
+        if index % self.KEYFRAME_INTERVAL == 0:
+            self.keyframes.pop()
+        self.delta_offsets.pop()
+        start, end = self.delta_offsets[-1], len(self.delta_cells)
+        if index == 0:
+            self.last_board = None
+        else:
+            self.last_board.flat[self.delta_cells[start:end].tolist()] = self.delta_old[start:end].tolist()
+        del self.delta_cells[start:end]
+        del self.delta_old[start:end]
+        del self.delta_new[start:end]
+        return action
+
     def get(self, index: int) -> Action:
         """
         return the action at log position 'index'
         """
-        return self.actions[index]
-    
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('action log index out of range')
+        from_pos, to_pos = self.unpackMove(self.moves[index])
+        return Action(from_pos, to_pos, self.NAMES[self.action_codes[index]],
+                      self.NAMES[self.piece_codes[index]], self.damages[index])
+
+    def getMove(self, index: int) -> tuple:
+        """
+        return the from- and to-position of the action at log position 'index'.
+        """
+        return self.unpackMove(self.moves[index])
+
+    def getBoard(self, index: int) -> np.ndarray:
+        """
+        return the board after the action at log position 'index', rebuilt
+        from the last keyframe and at most KEYFRAME_INTERVAL-1 changes.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('action log index out of range')
+        keyframe = index // self.KEYFRAME_INTERVAL
+        board = self.keyframes[keyframe].copy()
+        start = self.delta_offsets[keyframe * self.KEYFRAME_INTERVAL + 1]
+        end = self.delta_offsets[index + 1]
+        if end > start:
+            board.flat[self.delta_cells[start:end].tolist()] = self.delta_new[start:end].tolist()
+        return board
+
+    def getBoards(self) -> np.ndarray:
+        """
+        return the boards after every action as a stack with the shape
+        (len(self), height, width), replaying the changes only once.
+        """
+        boards = np.empty((len(self),) + config.DIMENSION, dtype=config.boardDtype)
+        board = None
+        for index in range(len(self)):
+            if index % self.KEYFRAME_INTERVAL == 0:
+                board = self.keyframes[index // self.KEYFRAME_INTERVAL].copy()
+            else:
+                start, end = self.delta_offsets[index], self.delta_offsets[index + 1]
+                if end > start:
+                    board.flat[self.delta_cells[start:end].tolist()] = self.delta_new[start:end].tolist()
+            boards[index] = board
+        return boards
+
     def getPrintActionString(self, actionLogIndex: int = -1, color: str = '32') -> str:
         """
         generate a string to represent an action
@@ -55,5 +196,34 @@ class ActionLog:
         print(self.getPrintActionString(actionLogIndex, color))
         
     def __repr__(self) -> str:
-        return ''.join([self.getPrintActionString(i, '33') for i in range(len(self.actions))])
-        
\ No newline at end of file
+        return ''.join([self.getPrintActionString(i, '33') for i in range(len(self))])
+        
+
+class UndoRecord:
+    def __init__(self, piece: Piece, from_pos: tuple, firstMove: bool) -> None:
+        """
+        everything that is needed to take back the turn of 'piece',
+        which started at 'from_pos' with the given 'firstMove' flag.
+        """
+        self.piece = piece
+        self.from_pos = from_pos
+        self.firstMove = firstMove
+        # the rook and its position before castling
+        self.rook = None
+        self.rook_pos = None
+        # the attacked piece and the healthpoints it lost
+        self.target = None
+        self.damage = 0
+        # the indices of a taken target within the piece lists
+        self.captured = None
+        # the pawn that has been replaced by a promotion
+        self.promoted = None
+        self.promoted_indices = None
+        # the piece taken from the crazy pool for a placement and its index
+        self.pool_piece = None
+        self.pool_index = None
+        # the en Passant cell and the move counters before the turn (see GameState.getTurnState)
+        self.turn_state = None
+        self.placed = False
+        self.logged = False
+        self.passed = False
@@ -0,0 +1,281 @@
+import numpy as np
+
+from chess_to_the_death.entity.pieces import Bishop, King, Knight, Pawn, Queen, Rook, flipOffsets
+from chess_to_the_death.util.definition import PieceChar, pieceTranslateDic
+
+
+# (dx, dy) directions of the sliding pieces (see the piece definitions). The index of a cell is
+# 'row * width + col', therefor a direction is 'positive' if walking along it
+# increases the cell index.
+ROOK_DIRECTIONS = list(Rook.slides)
+BISHOP_DIRECTIONS = list(Bishop.slides)
+QUEEN_DIRECTIONS = list(Queen.slides)
+KNIGHT_OFFSETS = list(Knight.leaps)
+KING_OFFSETS = list(King.leaps)
+
+PAWN = pieceTranslateDic[PieceChar.PAWN]
+KNIGHT = pieceTranslateDic[PieceChar.KNIGHT]
+BISHOP = pieceTranslateDic[PieceChar.BISHOP]
+ROOK = pieceTranslateDic[PieceChar.ROOK]
+QUEEN = pieceTranslateDic[PieceChar.QUEEN]
+KING = pieceTranslateDic[PieceChar.KING]
+
+# the precomputed masks only depend on the board dimension, so every
+# BitBoard of the same size shares them.
+_MOVE_TABLES = {}
+
+
+class MoveTables:
+    def __init__(self, dimension: tuple):
+        """
+        precompute the ray- and leaper-masks of every cell for a board
+        with the shape 'dimension' (height, width).
+        """
+        self.height, self.width = dimension
+        self.size = self.height * self.width
+        self.coords = [(idx % self.width, idx // self.width) for idx in range(self.size)]
+
+        self.rays = {}
+        self.positive = {}
+        for direction in QUEEN_DIRECTIONS:
+            self.rays[direction] = [self._rayMask(idx, direction) for idx in range(self.size)]
+            self.positive[direction] = (direction[1] * self.width + direction[0]) > 0
+        self.knight = [self._leaperMask(idx, KNIGHT_OFFSETS) for idx in range(self.size)]
+        self.king = [self._leaperMask(idx, KING_OFFSETS) for idx in range(self.size)]
+        # pawn attacks/pushes indexed by the walking direction (False -> up, True -> down)
+        self.pawn_attacks = [[self._leaperMask(idx, Pawn.attack_leaps) for idx in range(self.size)],
+                             [self._leaperMask(idx, flipOffsets(Pawn.attack_leaps)) for idx in range(self.size)]]
+        self.pawn_pushes = [[self._leaperMask(idx, Pawn.pushes) for idx in range(self.size)],
+                            [self._leaperMask(idx, flipOffsets(Pawn.pushes)) for idx in range(self.size)]]
+
+    def _inBounds(self, x: int, y: int) -> bool:
+        return (0 <= x < self.width) and (0 <= y < self.height)
+
+    def _rayMask(self, idx: int, direction: tuple) -> int:
+        mask = 0
+        x, y = self.coords[idx]
+        x, y = x + direction[0], y + direction[1]
+        while self._inBounds(x, y):
+            mask |= 1 << (y * self.width + x)
+            x, y = x + direction[0], y + direction[1]
+        return mask
+
+    def _leaperMask(self, idx: int, offsets: list) -> int:
+        mask = 0
+        x, y = self.coords[idx]
+        for dx, dy in offsets:
+            if self._inBounds(x + dx, y + dy):
+                mask |= 1 << ((y + dy) * self.width + x + dx)
+        return mask
+
+
+def getMoveTables(dimension: tuple) -> MoveTables:
+    """
+    return the (cached) MoveTables for the board dimension (height, width).
+    """
+    if dimension not in _MOVE_TABLES:
+        _MOVE_TABLES[dimension] = MoveTables(dimension)
+    return _MOVE_TABLES[dimension]
+
+
+class BitBoard:
+    """
+    Integer occupancy masks of a numpy-array board. The cell (x, y) is
+    represented by the bit 'y * width + x'.
+    """
+    def __init__(self, board: np.ndarray):
+        self.tables = getMoveTables(board.shape)
+        self.width = self.tables.width
+        self.load(board)
+
+    def load(self, board: np.ndarray) -> None:
+        """
+        rebuild all masks from the numpy-array board.
+        """
+        # colors[False] -> black (negative ids), colors[True] -> white (positive ids)
+        self.colors = [0, 0]
+        self.types = [0] * (len(pieceTranslateDic) // 2)
+        self.occupied = 0
+        for idx in np.flatnonzero(board).tolist():
+            self.setCell(idx, 0, int(board.flat[idx]))
+
+    def setCell(self, idx: int, old_value: int, new_value: int) -> None:
+        """
+        replace the piece-id 'old_value' on the cell with the index 'idx'
+        by the piece-id 'new_value'.
+        """
+        bit = 1 << idx
+        if old_value:
+            self.colors[old_value > 0] &= ~bit
+            self.types[abs(old_value)] &= ~bit
+            self.occupied &= ~bit
+        if new_value:
+            self.colors[new_value > 0] |= bit
+            self.types[abs(new_value)] |= bit
+            self.occupied |= bit
+
+    def toCells(self, mask: int) -> list:
+        """
+        convert a mask into a list of position-tuples (x, y).
+        """
+        cells = []
+        coords = self.tables.coords
+        while mask:
+            low = mask & -mask
+            cells.append(coords[low.bit_length() - 1])
+            mask ^= low
+        return cells
+
+    def toArray(self, mask: int) -> np.ndarray:
+        """
+        convert a mask into a boolean numpy-array in the shape of the board.
+        """
+        size = self.tables.size
+        bits = np.unpackbits(np.frombuffer(mask.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8),
+                             count=size, bitorder='little')
+        return bits.astype(bool).reshape(size // self.width, self.width)
+
+    def slidingMask(self, idx: int, directions: list, occupied: int = None) -> int:
+        """
+        return all cells reachable from 'idx' along the 'directions',
+        including the first blocking cell of each ray.
+        A different 'occupied' mask can be given to look through pieces.
+        """
+        mask = 0
+        if occupied is None:
+            occupied = self.occupied
+        for direction in directions:
+            ray = self.tables.rays[direction][idx]
+            blockers = ray & occupied
+            if blockers:
+                if self.tables.positive[direction]:
+                    blocker = (blockers & -blockers).bit_length() - 1
+                else:
+                    blocker = blockers.bit_length() - 1
+                ray ^= self.tables.rays[direction][blocker]
+            mask |= ray
+        return mask
+
+    def nearest(self, blockers: int, direction: tuple) -> int:
+        """
+        return the index of the blocker closest to the start of a ray in 'direction'.
+        """
+        if self.tables.positive[direction]:
+            return (blockers & -blockers).bit_length() - 1
+        return blockers.bit_length() - 1
+
+    def attackersOf(self, idx: int, white: bool, flip: bool, occupied: int = None) -> int:
+        """
+        return a mask of all pieces of the player 'white' that attack the cell 'idx',
+        no matter which piece stands on that cell. 'flip' is the walking direction
+        of the attacking pawns and 'occupied' an optional occupancy for the sliders.
+        """
+        tables, types, own = self.tables, self.types, self.colors[white]
+        attackers = tables.knight[idx] & types[KNIGHT] & own
+        attackers |= tables.king[idx] & types[KING] & own
+        # a pawn walking in 'flip' direction attacks the cell from the opposite direction
+        attackers |= tables.pawn_attacks[not flip][idx] & types[PAWN] & own
+        rooks = (types[ROOK] | types[QUEEN]) & own
+        if rooks:
+            attackers |= self.slidingMask(idx, ROOK_DIRECTIONS, occupied) & rooks
+        bishops = (types[BISHOP] | types[QUEEN]) & own
+        if bishops:
+            attackers |= self.slidingMask(idx, BISHOP_DIRECTIONS, occupied) & bishops
+        return attackers
+
+    def getCheckEvasion(self, idx: int, white: bool, flip: bool) -> tuple:
+        """
+        Takes the cell index of the king of the player 'white' and the walking direction
+        'flip' of the enemy pawns. Returns the mask of checking pieces and the mask of cells
+        a non-king piece has to move to, in order to capture or block the check.
+        """
+        checkers = self.attackersOf(idx, not white, flip)
+        if not checkers:
+            return (0, (1 << self.tables.size) - 1)
+        if checkers & (checkers - 1):
+            # double check, only the king itself can move
+            return (checkers, 0)
+        checker = checkers.bit_length() - 1
+        for direction in QUEEN_DIRECTIONS:
+            ray = self.tables.rays[direction][idx]
+            if (ray >> checker) & 1:
+                # the cells between the king and the checking slider
+                return (checkers, ray ^ self.tables.rays[direction][checker])
+        return (checkers, checkers)
+
+    def getPins(self, idx: int, white: bool) -> dict:
+        """
+        Takes the cell index of the king of the player 'white'. Returns a dictionary
+        with the index of every pinned friendly piece and the mask of cells along its pin ray.
+        """
+        pins = {}
+        own, occupied = self.colors[white], self.occupied
+        enemies = self.colors[not white]
+        rooks = (self.types[ROOK] | self.types[QUEEN]) & enemies
+        bishops = (self.types[BISHOP] | self.types[QUEEN]) & enemies
+        for direction in QUEEN_DIRECTIONS:
+            sliders = rooks if direction in ROOK_DIRECTIONS else bishops
+            if not sliders:
+                continue
+            ray = self.tables.rays[direction][idx]
+            blockers = ray & occupied
+            if not blockers:
+                continue
+            pinned = self.nearest(blockers, direction)
+            if not (own >> pinned) & 1:
+                continue
+            blockers = self.tables.rays[direction][pinned] & occupied
+            if not blockers:
+                continue
+            pinner = self.nearest(blockers, direction)
+            if (sliders >> pinner) & 1:
+                pins[pinned] = ray ^ self.tables.rays[direction][pinner]
+        return pins
+
+    def getOptionMasks(self, idx: int, pieceChar: str, firstMove: bool, flip: bool) -> tuple:
+        """
+        Takes the cell index and type of a piece and returns a tuple
+        containing the movement-mask and the attack-mask of the piece.
+        Like Piece.isEnemy the color is taken from the id on the board at 'idx'.
+        """
+        enemies = 0
+        if (self.colors[True] >> idx) & 1:
+            enemies = self.colors[False]
+        elif (self.colors[False] >> idx) & 1:
+            enemies = self.colors[True]
+        if pieceChar == PieceChar.PAWN:
+            tables = self.tables
+            options_move = tables.pawn_pushes[flip][idx] & ~self.occupied
+            if options_move and firstMove:
+                options_move |= tables.pawn_pushes[flip][options_move.bit_length() - 1] & ~self.occupied
+            return (options_move, tables.pawn_attacks[flip][idx] & enemies)
+        if pieceChar == PieceChar.KNIGHT:
+            reachable = self.tables.knight[idx]
+        elif pieceChar == PieceChar.KING:
+            reachable = self.tables.king[idx]
+        elif pieceChar == PieceChar.ROOK:
+            reachable = self.slidingMask(idx, ROOK_DIRECTIONS)
+        elif pieceChar == PieceChar.BISHOP:
+            reachable = self.slidingMask(idx, BISHOP_DIRECTIONS)
+        elif pieceChar == PieceChar.QUEEN:
+            reachable = self.slidingMask(idx, QUEEN_DIRECTIONS)
+        else:
+            return (0, 0)
+        return (reachable & ~self.occupied, reachable & enemies)
+
+    def getOptions(self, pos: tuple, pieceChar: str, firstMove: bool, flip: bool) -> tuple:
+        """
+        Takes the position (x, y) and type of a piece and returns
+        the same tuple of movement- and attack-lists as Piece.getOptions.
+        """
+        options_move, options_attack = self.getOptionMasks(pos[1] * self.width + pos[0], pieceChar, firstMove, flip)
+        return (self.toCells(options_move), self.toCells(options_attack))
+
+    def toMask(self, cells: list) -> int:
+        """
+        convert a list of position-tuples (x, y) into a mask.
+        """
+        mask = 0
+        for x, y in cells:
+            mask |= 1 << (y * self.width + x)
+        return mask
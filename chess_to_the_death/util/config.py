@@ -15,6 +15,28 @@ board = np.asarray([[-4, -3, -2, -5, -6, -2, -3, -4],
 DIMENSION = board.shape
 assert (len(pieceTranslateDic)//2) ** 2 <= np.iinfo(boardDtype).max, "The BoardDtype has to be smaller than sqrt(max(pieceID))."
 BLACKS_TURN = False
+# the castling rights (e.g. 'KQkq' or '-'), None if the FEN does not tell
+# them and every king and rook that has not moved yet is allowed to castle
+CASTLING_RIGHTS = None
+# the cell (x, y) a pawn has skipped with its double step
+EN_PASSANT = None
+HALFMOVE_CLOCK = 0
+FULLMOVE_NUMBER = 1
+
+
+def getCellName(pos: tuple) -> str:
+    """
+    returns the FEN name of the cell at position 'pos' (x, y), e.g. 'e3'.
+    """
+    return chr(97 + pos[0]) + str(DIMENSION[0] - pos[1])
+
+
+def getCellPos(cellName: str) -> tuple:
+    """
+    returns the position (x, y) of a cell by its FEN name (see getCellName).
+    """
+    return (ord(cellName[0].lower()) - 97, DIMENSION[0] - int(cellName[1:]))
+
 
 def generateBoardFromFEN(fen: str, isCrazyMode: bool) -> None:
     if fen == None:
@@ -22,6 +44,10 @@ def generateBoardFromFEN(fen: str, isCrazyMode: bool) -> None:
     global board
     global DIMENSION
     global BLACKS_TURN
+    global CASTLING_RIGHTS
+    global EN_PASSANT
+    global HALFMOVE_CLOCK
+    global FULLMOVE_NUMBER
     whiteSpaceSplit = fen.split(" ")
     boardSplit = whiteSpaceSplit[0].split("/")
     tempBoard = []
@@ -49,8 +75,13 @@ def generateBoardFromFEN(fen: str, isCrazyMode: bool) -> None:
         tempBoard = [row + [0] * (maxRowLength-len(row)) for row in tempBoard]
     board = np.asarray(tempBoard, dtype=boardDtype)
     DIMENSION = board.shape
-    if len(whiteSpaceSplit) >= 2 and whiteSpaceSplit[1].upper() == "B":
-        BLACKS_TURN = True
+    BLACKS_TURN = len(whiteSpaceSplit) >= 2 and whiteSpaceSplit[1].upper() == "B"
+    CASTLING_RIGHTS = whiteSpaceSplit[2] if len(whiteSpaceSplit) >= 3 else None
+    EN_PASSANT = None
+    if len(whiteSpaceSplit) >= 4 and whiteSpaceSplit[3] != "-":
+        EN_PASSANT = getCellPos(whiteSpaceSplit[3])
+    HALFMOVE_CLOCK = int(whiteSpaceSplit[4]) if len(whiteSpaceSplit) >= 5 else 0
+    FULLMOVE_NUMBER = int(whiteSpaceSplit[5]) if len(whiteSpaceSplit) >= 6 else 1
     possiblePieceOptions = [attr for attr in dir(PieceChar) if not callable(getattr(PieceChar, attr)) and not attr.startswith("__")]
     # the options to promote/crazyplace a piece will not fit if the board height is less than 4, or
     # the crazyoptions exceed the board height. We subtract UNDEFINED, OBSTACLE, and KING, because we cannot crazyplace these.
@@ -59,10 +90,13 @@ def generateBoardFromFEN(fen: str, isCrazyMode: bool) -> None:
         print("\x1b[33mWARNING: the board height is unusually small. You may experience problems promoting or crazyplacing pieces.\x1b[0m")
 
 
-def generateFENFromBoard(board: np.ndarray, whites_turn: bool) -> str:
+def generateFENFromBoard(board: np.ndarray, whites_turn: bool, castlingRights: str = "KQkq",
+                         enPassant: tuple = None, halfmoveClock: int = 0, fullmoveNumber: int = 1) -> str:
+    """
+    returns the FEN of a position (see GameState.getFEN). 'enPassant' is the cell (x, y)
+    a pawn has skipped with its double step.
+    """
     player_turn = "w" if whites_turn else "b"
-    if not whites_turn:
-        board = np.flip(board, (0,1))
     fenRows = []
     for row in board:
         fenRow = ""
@@ -81,4 +115,5 @@ def generateFENFromBoard(board: np.ndarray, whites_turn: bool) -> str:
         if empty > 0:
             fenRow += str(empty)
         fenRows.append(fenRow)
-    return f"{'/'.join(fenRows)} {player_turn} KQkq - 0 1"
+    enPassant = getCellName(enPassant) if enPassant is not None else "-"
+    return f"{'/'.join(fenRows)} {player_turn} {castlingRights or '-'} {enPassant} {halfmoveClock} {fullmoveNumber}"
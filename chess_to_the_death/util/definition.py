@@ -48,6 +48,9 @@ class PieceValues:
              PieceChar.KING: 10,
              PieceChar.OBSTACLE: 0}
     
+# the piece types a pawn can be promoted to
+promotionOptions = [PieceChar.BISHOP, PieceChar.KNIGHT, PieceChar.QUEEN, PieceChar.ROOK]
+
 pieceTranslateDic = {}
 for id, char in enumerate(PieceNames.NAMES.keys()):
     pieceTranslateDic[id] = char
@@ -1,30 +1,29 @@
 import numpy as np
-from itertools import product
 
 import chess_to_the_death.util.config as config
 import chess_to_the_death.parser.argparser as argparser
 from chess_to_the_death.entity.pieces import *
 from chess_to_the_death.entity.player import Player
-from chess_to_the_death.util.action import Action, ActionLog
+from chess_to_the_death.util.action import Action, ActionLog, UndoRecord
+from chess_to_the_death.util.bitboard import BitBoard
+from chess_to_the_death.util.piecestore import PieceStore
+from chess_to_the_death.util.snapshot import Snapshot
+from chess_to_the_death.util.zobrist import ZobristKeys, RIGHTS_PIECES, getZobristKeys
 from chess_to_the_death.util.definition import *
 
 
-def createPiece(name: str, pos: tuple, player: str, image_size):
+# the range of the health- and damage values of the random parameter
+RANDOM_VALUE_RANGE = (10, 150)
+# kings and rooks are allowed to castle as long as they have not moved
+CASTLING_PIECES = (PieceChar.KING, PieceChar.ROOK)
+
+
+def createPiece(name: str, pos: tuple, player: str):
     """
     return the Piece Object according to the char identifier 'name'
     """
-    if name == PieceChar.PAWN:
-        return Pawn(  pos, player, image_size)
-    if name == PieceChar.BISHOP:
-        return Bishop(pos, player, image_size)
-    if name == PieceChar.KNIGHT:
-        return Knight(pos, player, image_size)
-    if name == PieceChar.ROOK:
-        return Rook(  pos, player, image_size)
-    if name == PieceChar.QUEEN:
-        return Queen( pos, player, image_size)
-    if name == PieceChar.KING:
-        return King(  pos, player, image_size)
+    if name in PIECE_TYPES:
+        return PIECE_TYPES[name](pos, player)
     print("Unknown Piece:", name)
     return None
 
@@ -64,24 +63,42 @@ def printValueStatistic(health_damage_dict: dict) -> None:
 
 
 class GameState:
-    def __init__(self, image_size: tuple):
+    def __init__(self, bitboard: bool = True, displayInfo: bool = True, health_damage: dict = None):
+        # the engine keeps white at the bottom of the board, flipping
+        # the board for black is left to the gui
         self.alpha_identifiers = list(map(chr, range(65, 65+config.DIMENSION[1])))
         self.numbers_identifiers = list(map(str, range(config.DIMENSION[0], 0, -1)))
         
-        self.image_size: tuple = image_size
-        self.flip_board: bool = argparser.FLIP_BOARD
         self.default: bool = argparser.DEFAULT_MODE
         self.random: bool = argparser.RANDOM_VALUES
         self.crazy: bool = argparser.CRAZY_MODE
+        self.debug: bool = argparser.DEBUG_MODE
         self.player_turn: bool = True # True -> 'white', False -> 'black'
-        self.board_flipped: bool = False
         
         self.board: np.ndarray = None
+        # generate the piece options with integer masks instead of
+        # walking the numpy-array board cell by cell
+        self.bitboard: bool = bitboard
+        self.bitboards: BitBoard = None
+        # every change of the board increases the board_version, which
+        # invalidates everything cached about the position (attack maps, pins, ...)
+        self.board_version: int = 0
+        self.board_cache: dict = {}
+        self.board_cache_version: int = -1
+        # zobrist hash of the pieces on the board, their castling/double-step rights
+        # and (if not playing the default variant) their health
+        self.zobrist: ZobristKeys = getZobristKeys(config.DIMENSION)
+        self.zobrist_hash: int = 0
+        self.hash_health: bool = not self.default
+        self.position_counts: dict = {}
+        self.position_history: list[int] = []
         
         self.white_pieces: list[Piece] = []
         self.black_pieces: list[Piece] = []
         self.king_pieces: list[Piece] = [None, None]
         self.pieces: list[Piece] = []  
+        # index of every piece by its position (x, y)
+        self.piece_map: dict = {}
         
         self.white_casualties: list[Piece] = []
         self.black_casualties: list[Piece] = []
@@ -90,8 +107,26 @@ class GameState:
         self.value_taken: list[int] = [0, 0]
         
         self.action_log: ActionLog = ActionLog()
+        # one record per turn, to take back the turns with unmakeMove
+        self.undo_stack: list[UndoRecord] = []
+        # the outcome of the game, once a turn played with makeMove finished it
+        self.outcome: str = Outcome.NONE
+        # the cells of the kings and rooks that are still allowed to castle (see BitBoard),
+        # updated with every piece put onto or taken off the board
+        self.castling_rights: int = 0
+        # the cell (x, y) the pawn of the last action has skipped with its double step,
+        # the target of an en Passant attack
+        self.en_passant: tuple = config.EN_PASSANT
+        # the number of turns since the last pawn move or attack, and the number
+        # of the current turn of white and black (like in the FEN)
+        self.halfmove_clock: int = config.HALFMOVE_CLOCK
+        self.fullmove_number: int = config.FULLMOVE_NUMBER
+        # the last snapshot, it is shared until the position changes (see getSnapshot)
+        self.snapshot: Snapshot = None
+        self.snapshot_key: tuple = None
         
-        self.health_damage_dict = {}
+        # the health- and damage values can be given explicitly (e.g. by the tuner)
+        self.health_damage_dict = dict(health_damage) if health_damage else {}
 
         # generate the pieces of the default gameBoard defined in config.py
         for row in range(config.board.shape[0]):
@@ -100,10 +135,10 @@ class GameState:
                     continue
                 pieceChar = pieceTranslateDic[abs(config.board[row, col])]
                 if config.board[row, col] < 0:
-                    piece = createPiece(pieceChar, (col, row), Player.PLAYER_B, image_size)
+                    piece = createPiece(pieceChar, (col, row), Player.PLAYER_B)
                     self.black_pieces.append(piece)
                 else:
-                    piece = createPiece(pieceChar, (col, row), Player.PLAYER_W, image_size)
+                    piece = createPiece(pieceChar, (col, row), Player.PLAYER_W)
                     self.white_pieces.append(piece)
                 if pieceChar == PieceChar.KING:
                     self.king_pieces[config.board[row, col] > 0] = piece
@@ -118,7 +153,7 @@ class GameState:
         for piece in self.pieces:
             if piece._name not in self.health_damage_dict:
                 if self.random:
-                    self.health_damage_dict[piece._name] = (randint(10, 150), randint(10, 150))
+                    self.health_damage_dict[piece._name] = (randint(*RANDOM_VALUE_RANGE), randint(*RANDOM_VALUE_RANGE))
                 else:
                     self.health_damage_dict[piece._name] = (piece.health, piece.damage)
             piece.maxHealth = piece.health = self.health_damage_dict[piece._name][0]
@@ -130,43 +165,48 @@ class GameState:
             for piece in self.pieces:
                 piece.maxHealth = piece.health = 1
                 piece.damage = 1
-        else:
+        elif displayInfo:
             # if not the default variant is palyed, print the statistics
             # about piece health/damage values.
             printValueStatistic(self.health_damage_dict)
+        self.createBoard()
+        if config.CASTLING_RIGHTS is not None:
+            self.setCastlingRights(config.CASTLING_RIGHTS)
         if config.BLACKS_TURN:
             self.nextTurn(False)
-        self.createBoard()
-        print(self.__repr__())
+        if displayInfo:
+            print(self.__repr__())
         
-        self.player_turn = not self.player_turn
-        if (self.default and self.isCellAttacked(self.king_pieces[self.player_turn].getPos())) or \
+        # the position is checked as if the player not to move had just played
+        lastPlayer = not self.player_turn
+        if (self.default and self.isCellAttacked(self.king_pieces[lastPlayer].getPos(), lastPlayer)) or \
              not (np.count_nonzero(self.board == pieceTranslateDic[PieceChar.KING]) == np.count_nonzero(self.board == -pieceTranslateDic[PieceChar.KING]) == 1):
             print('\x1b[31mCannot load position because it is invalid. Every position must have exactly one king of each color, and the side to move must not be able to capture the enemy king.\x1b[0m')
             from sys import exit as sysexit
             sysexit(1)
-        currentOutcome = self.playerWon()
+        currentOutcome = self.playerWon(lastPlayer)
         if currentOutcome != Outcome.NONE:
             print('\x1b[31mCannot load position because it has already reached a finished state:\x1b[0m')
             print('\x1b[31m', currentOutcome, '\x1b[0m', sep='')
             from sys import exit as sysexit
             sysexit(1)
-        self.player_turn = not self.player_turn
 
     def translateActionRepr(self, actionRepr: Action) -> list:
         """
         Takes an action-object and reverts it to row and column numbers.
         Returns a list with original starting and target position tuple.
-        Depends on current board flip!
         """
-        from_col = self.alpha_identifiers.index(actionRepr.from_col)
-        from_row = self.numbers_identifiers.index(actionRepr.from_row)
-        to_col = self.alpha_identifiers.index(actionRepr.to_col)
-        to_row = self.numbers_identifiers.index(actionRepr.to_row)
-        
-        return [(from_col, from_row), (to_col, to_row)]
+        return [actionRepr.from_pos, actionRepr.to_pos]
+
+    def getLastMove(self) -> tuple:
+        """
+        Returns the starting and target position of the last action
+        on the current board.
+        """
+        return self.action_log.getMove(-1)
 
-    def writeActionLog(self, from_pos: tuple, to_pos: tuple, action: str = '', pieceChar: str = PieceChar.UNDEFINED) -> None:
+    def writeActionLog(self, from_pos: tuple, to_pos: tuple, action: str = '', pieceChar: str = PieceChar.UNDEFINED,
+                       damage: int = 0) -> None:
         """
         Take the column and row of start- and target position of any action.
         Saves an action object of said action. e.g.:(C1-G5) to the action_log list.
@@ -175,9 +215,88 @@ class GameState:
         pieceName = PieceNames.NAMES[pieceChar]
         if pieceName == PieceNames.NAMES[PieceChar.UNDEFINED]:
             pieceName = ''
-        self.action_log.add(self.board, self.alpha_identifiers[from_pos[0]], self.numbers_identifiers[from_pos[1]],
-                self.alpha_identifiers[to_pos[0]], self.numbers_identifiers[to_pos[1]], action, pieceName)
+        self.action_log.add(self.board, from_pos, to_pos, action, pieceName, damage)
+        self.recordPosition()
+
+    def recordPosition(self) -> None:
+        """
+        count the current position for the detection of repetitions.
+        """
+        positionHash = self.getPositionHash()
+        self.position_history.append(positionHash)
+        self.position_counts[positionHash] = self.position_counts.get(positionHash, 0) + 1
+
+    def forgetPosition(self) -> None:
+        """
+        remove the last counted position (see recordPosition).
+        """
+        positionHash = self.position_history.pop()
+        self.position_counts[positionHash] -= 1
+        if not self.position_counts[positionHash]:
+            del self.position_counts[positionHash]
         
+    def getTurnState(self) -> tuple:
+        """
+        returns the en Passant cell and the move counters, to restore them with unmakeMove.
+        """
+        return (self.en_passant, self.halfmove_clock, self.fullmove_number)
+
+    def updateTurnState(self, piece: Piece, from_pos: tuple, to_pos: tuple, attacked: bool) -> None:
+        """
+        update the en Passant cell and the halfmove clock after 'piece' has acted
+        from 'from_pos' on 'to_pos' ('attacked' if it was an attack).
+        """
+        self.en_passant = None
+        if piece._name == PieceChar.PAWN and from_pos[0] == to_pos[0] and abs(from_pos[1] - to_pos[1]) == 2:
+            self.en_passant = (to_pos[0], (from_pos[1] + to_pos[1]) // 2)
+        # pawn moves and attacks reset the clock
+        if piece._name == PieceChar.PAWN or attacked:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+
+    def getCastlingRights(self) -> str:
+        """
+        returns the castling rights like in the FEN (e.g. 'KQkq' or '-').
+        Uppercase letters are the rights of white, 'K' to castle with the right-most rook.
+        """
+        castlingRights = ''
+        for white, letters in ((True, 'KQ'), (False, 'kq')):
+            king = self.king_pieces[white]
+            rights = self.castling_rights & self.bitboards.colors[white]
+            if not (rights >> self.cellIndex(king.getPos())) & 1:
+                continue
+            rooks = rights & self.bitboards.types[pieceTranslateDic[PieceChar.ROOK]]
+            for rookCol, letter in zip((config.DIMENSION[1]-1, 0), letters):
+                if (rooks >> self.cellIndex((rookCol, king.cell_row))) & 1:
+                    castlingRights += letter
+        return castlingRights or '-'
+
+    def setCastlingRights(self, castlingRights: str) -> None:
+        """
+        take the castling rights from a FEN (see getCastlingRights). Every king
+        and rook without a right to castle is treated as if it has moved.
+        """
+        for piece in self.pieces:
+            if piece._name in CASTLING_PIECES:
+                piece.firstMove = False
+        for white, letters in ((True, 'KQ'), (False, 'kq')):
+            king = self.king_pieces[white]
+            if king is None:
+                continue
+            for rookCol, letter in zip((config.DIMENSION[1]-1, 0), letters):
+                rook = self.getPiece((rookCol, king.cell_row))
+                if letter in castlingRights and rook and rook._name == PieceChar.ROOK and rook._player == king._player:
+                    rook.firstMove = king.firstMove = True
+        self.createBoard()
+
+    def getFEN(self) -> str:
+        """
+        returns the FEN of the current position.
+        """
+        return config.generateFENFromBoard(self.board, self.player_turn, self.getCastlingRights(), self.en_passant,
+                                           self.halfmove_clock, self.fullmove_number)
+
     def getPlayerValue(self) -> tuple:
         """
         return a tuple containing the piece-values, that have been taken.
@@ -197,8 +316,12 @@ class GameState:
             
         return (self.value_taken[1] - self.value_taken[0], white_casualties_ids, black_casualties_ids)
 
-    def getCrazyPlaceOptionsPieces(self):
-        if self.currentPlayer() == Player.PLAYER_W:
+    def getCrazyPlaceOptionsPieces(self, white: bool = None):
+        """
+        returns the pool of pieces the player 'white' (by default the
+        current player) is able to place.
+        """
+        if self.player_turn if white is None else white:
             return self.black_crazyoptions
         return self.white_crazyoptions
     
@@ -219,10 +342,7 @@ class GameState:
         Takes a position tuple with (x,y) coordinates and returns
         the corresponding piece standing on that position.
         """
-        for piece in self.pieces:
-            if piece.getPos() == pos:
-                return piece
-        return None
+        return self.piece_map.get(pos)
 
     def selectablePiece(self, piece: Piece) -> bool:
         """
@@ -232,31 +352,133 @@ class GameState:
         return piece._player == self.currentPlayer()
 
     def isEmptyCell(self, pos: tuple) -> bool:
-        return not self.getPiece(pos)
+        return pos not in self.piece_map
     
-    def isCellAttacked(self, pos: tuple) -> bool:
+    def isCellAttacked(self, pos: tuple, white: bool = None) -> bool:
+        """
+        Check if a given cell is threatened by any enemy piece
+        of the player 'white' (by default the current player).
+        """
+        if white is None:
+            white = self.player_turn
+        attackMap = self.getAttackMap(not white)
+        return bool((attackMap >> self.cellIndex(pos)) & 1)
+
+    def getAttackMap(self, white: bool) -> int:
+        """
+        Returns a bitmap of all cells the pieces of the player 'white' can move to
+        or attack (see BitBoard for the cell indices).
+        The map is built in one pass over the pieces and cached until the board changes.
+        """
+        cache = self.getBoardCache()
+        key = ('attack', white)
+        if key in cache:
+            return cache[key]
+        player = Player.OPTIONS[white]
+        flip = self.pawnFlip(white)
+        attackMap = 0
+        for piece in self.pieces:
+            if piece._player != player:
+                continue
+            options_move, options_attack = self.getPieceOptionMasks(piece, flip)
+            attackMap |= options_move | options_attack
+        cache[key] = attackMap
+        return attackMap
+
+    def getLegality(self, white: bool) -> tuple:
+        """
+        Computes the checks and pins of the player 'white' in one pass
+        from the position of its king. Cached until the board changes.
+        Returns a tuple containing the mask of checking pieces, the mask of cells that
+        capture or block the check and a dictionary of pinned pieces (see BitBoard.getPins).
+        """
+        cache = self.getBoardCache()
+        key = ('legality', white)
+        if key not in cache:
+            kingIdx = self.cellIndex(self.king_pieces[white].getPos())
+            checkers, evasion = self.bitboards.getCheckEvasion(kingIdx, white, self.pawnFlip(not white))
+            cache[key] = (checkers, evasion, self.bitboards.getPins(kingIdx, white))
+        return cache[key]
+
+    def getLegalMask(self, piece: Piece, options: int) -> int:
+        """
+        Takes a 'piece' and the mask of its 'options' and returns the mask
+        of options, that do not expose the own king to attacks.
+        """
+        white = piece._player == Player.PLAYER_W
+        idx = self.cellIndex(piece.getPos())
+        if piece is self.king_pieces[white]:
+            # the king must not step onto an attacked cell. Sliders are
+            # able to look through the cell the king is leaving.
+            occupied = self.bitboards.occupied & ~(1 << idx)
+            flip = self.pawnFlip(not white)
+            legal = 0
+            while options:
+                target = options & -options
+                options ^= target
+                if not self.bitboards.attackersOf(target.bit_length() - 1, not white, flip, occupied):
+                    legal |= target
+            return legal
+        _, evasion, pins = self.getLegality(white)
+        return options & evasion & pins.get(idx, evasion)
+
+    def isLegalEnPassant(self, piece: Piece, to_pos: tuple) -> bool:
+        """
+        Checks whether the en Passant attack of the pawn 'piece' onto 'to_pos' does
+        not expose the own king. Both pawns leave their row at once, so
+        this cannot be derived from the pins.
+        """
+        white = piece._player == Player.PLAYER_W
+        captured = 1 << self.cellIndex((to_pos[0], piece.cell_row))
+        occupied = (self.bitboards.occupied & ~(1 << self.cellIndex(piece.getPos())) & ~captured) | \
+            (1 << self.cellIndex(to_pos))
+        attackers = self.bitboards.attackersOf(self.cellIndex(self.king_pieces[white].getPos()),
+                                               not white, self.pawnFlip(not white), occupied)
+        return not (attackers & ~captured)
+
+    def hasLegalOptions(self, white: bool = None) -> bool:
         """
-        Check if a given cell is threatened by any enemy piece.
+        Checks whether the player 'white' (by default the current player)
+        has any legal move or attack left.
         """
+        if white is None:
+            white = self.player_turn
+        king = self.king_pieces[white]
+        flip = self.pawnFlip(white)
+        options_move, options_attack = self.getPieceOptionMasks(king, flip)
+        if self.getLegalMask(king, options_move | options_attack):
+            return True
         for piece in self.pieces:
-            if piece._player == self.currentPlayer():
+            if piece._player != Player.OPTIONS[white] or piece is king:
                 continue
-            options_move, options_attack = piece.getOptions(self.board, not self.flippedAction())
-            if pos in (options_move + options_attack):
+            options_move, options_attack = self.getPieceOptionMasks(piece, flip)
+            if self.getLegalMask(piece, options_move | options_attack):
                 return True
-        return False
+            for pos in self.getEnPassantOptions(piece):
+                if self.isLegalEnPassant(piece, pos):
+                    return True
+        return bool(self.getCastleOptions(king))
+
+    def getPlayerPieces(self, piece: Piece) -> list:
+        """
+        returns the list of pieces of the player owning 'piece'.
+        """
+        if piece._player == Player.PLAYER_W:
+            return self.white_pieces
+        return self.black_pieces
 
-    def placePiece(self, pos: tuple, newPieceName: str) -> None:
+    def placePiece(self, pos: tuple, newPieceName: str, displayInfo: bool = True) -> None:
         """
         Takes an existing Piece and promotes it to another Piece-Type
         corresponding to the given 'newPieceName' identifier.
         (e.g. placePiece(Pawn(...), 'q') replaces the Pawn with a new Queen)
         This should only happen to Pawn-pieces, checks have to be made beforehand.
+        A piece placed on an empty cell is taken from the crazy pool.
         """
         oldPiece = self.getPiece(pos)
-        promotedPiece = createPiece(newPieceName, pos, self.currentPlayer(), self.image_size)
+        promotedPiece = createPiece(newPieceName, pos, self.currentPlayer())
         # set health- and damage values corresponding to the given argv parameters
-        if self.random:
+        if promotedPiece._name in self.health_damage_dict:
             promotedPiece.maxHealth = promotedPiece.health = self.health_damage_dict[promotedPiece._name][0]
             promotedPiece.damage = self.health_damage_dict[promotedPiece._name][1]           
         if self.default:
@@ -268,15 +490,37 @@ class GameState:
         else:
             self.black_pieces.append(promotedPiece)
         if oldPiece:
+            record = self.undo_stack[-1]
+            record.promoted = oldPiece
+            record.promoted_indices = (self.pieces.index(oldPiece), self.getPlayerPieces(oldPiece).index(oldPiece))
             self.pieces.remove(oldPiece)
             if oldPiece._player == Player.PLAYER_W:
                 self.white_pieces.remove(oldPiece)
             else:
                 self.black_pieces.remove(oldPiece)
+            self.removePiece(oldPiece)
         else:
+            record = UndoRecord(promotedPiece, pos, True)
+            record.turn_state = self.getTurnState()
+            record.placed = True
+            availablePieces = self.getCrazyPlaceOptionsPieces()
+            for i, piece in enumerate(availablePieces):
+                if piece._name == newPieceName:
+                    record.pool_piece, record.pool_index = availablePieces.pop(i), i
+                    break
+            self.undo_stack.append(record)
+        self.addPiece(promotedPiece)
+        if not oldPiece:
+            self.updateTurnState(promotedPiece, pos, pos, False)
             self.writeActionLog(pos, pos, 'placed', newPieceName)
-            self.action_log.printAction(-1)
-        self.createBoard()
+            if displayInfo:
+                self.action_log.printAction(-1)
+        elif self.position_history:
+            # the promotion completes the last logged action
+            self.en_passant = None
+            self.forgetPosition()
+            self.recordPosition()
+        self.verifyBoard()
 
     def promotePawnOption(self, piece: Piece) -> bool:
         """
@@ -303,11 +547,12 @@ class GameState:
         castleOptions = self.getCastleOptions(piece)
         for castleOption, rookPosition, rook in castleOptions:
             if castleOption == to_pos:
-                rook.move(rookPosition)
+                self.undo_stack[-1].rook, self.undo_stack[-1].rook_pos = rook, rook.getPos()
+                self.movePiece(rook, rookPosition)
                 action = ActionName.CASTLES
                 break
 
-        piece.move(to_pos)
+        self.movePiece(piece, to_pos)
         return action
 
     def attack(self, piece: Piece, to_pos: tuple, options_attack: list) -> str:
@@ -326,12 +571,18 @@ class GameState:
         attacked_piece = self.getPiece(to_pos)
         if enPassant:
             attacked_piece = self.getPiece((to_pos[0], to_pos[1] - (1 if self.flippedAction() else -1)))
-        attacked_piece.health -= piece.damage
-        if attacked_piece.health <= 0:
+        record = self.undo_stack[-1]
+        record.target, record.damage = attacked_piece, piece.damage
+        if attacked_piece.health - piece.damage > 0:
+            self.damagePiece(attacked_piece, piece.damage)
+        else:
             action = ActionName.TAKES
-            piece.move(to_pos)
+            record.captured = (self.pieces.index(attacked_piece),
+                               self.getPlayerPieces(attacked_piece).index(attacked_piece))
+            self.removePiece(attacked_piece)
+            attacked_piece.health -= piece.damage
+            self.movePiece(piece, to_pos)
             self.pieces.remove(attacked_piece)
-            print("Dead:", attacked_piece)
             if attacked_piece._player == Player.PLAYER_W:
                 self.white_pieces.remove(attacked_piece)
                 self.white_casualties.append(attacked_piece)
@@ -344,7 +595,7 @@ class GameState:
 
         return action
 
-    def action(self, piece: Piece, to_pos: tuple, options_move: list, options_attack: list) -> str:
+    def action(self, piece: Piece, to_pos: tuple, options_move: list, options_attack: list, displayInfo: bool = True) -> str:
         """
         Return an empty string if the action could not be performed (should generally not happen).
         Returns the action taken or in special cases an identifying string for promotion or game-end.
@@ -353,69 +604,173 @@ class GameState:
         if not piece:
             return gameStateAction
         from_pos = piece.getPos()
+        record = UndoRecord(piece, from_pos, piece.firstMove)
+        record.turn_state = self.getTurnState()
+        self.undo_stack.append(record)
         moves = self.move(piece, to_pos, options_move)
         attacks = self.attack(piece, to_pos, options_attack)
         gameStateAction = moves + attacks
-        self.createBoard()
-        if gameStateAction:
-            self.writeActionLog(from_pos, to_pos, moves + attacks)
-            self.action_log.printAction(-1)
+        self.verifyBoard()
+        if not gameStateAction:
+            self.undo_stack.pop()
+        else:
+            self.updateTurnState(piece, from_pos, to_pos, bool(attacks))
+            if displayInfo and attacks == ActionName.TAKES:
+                print("Dead:", self.undo_stack[-1].target)
+            self.writeActionLog(from_pos, to_pos, moves + attacks, damage=self.undo_stack[-1].damage)
+            if displayInfo:
+                self.action_log.printAction(-1)
             if self.playerWon():
                 return Outcome.GAME_FINISHED
             if self.promotePawnOption(piece):
                 return Outcome.PAWN_PROMOTION
         return gameStateAction
+
+    def getTurns(self) -> list:
+        """
+        Returns a list of all turns (from_pos, to_pos, pieceName) the current player
+        is able to play with makeMove. A turn is listed once for every promotion option
+        if it promotes a pawn. Crazy placements start and end on the same empty cell.
+        """
+        turns = []
+        lastRow = (0, config.DIMENSION[0]-1)
+        for piece in (self.white_pieces if self.player_turn else self.black_pieces):
+            options_move, options_attack = self.getOptions(piece)
+            from_pos = piece.getPos()
+            for to_pos in options_move + options_attack:
+                # the pawn is only promoted, if it actually reaches the last row
+                if piece._name == PieceChar.PAWN and to_pos[1] in lastRow and \
+                    (to_pos in options_move or self.getPiece(to_pos).health <= piece.damage):
+                    turns.extend((from_pos, to_pos, pieceName) for pieceName in promotionOptions)
+                else:
+                    turns.append((from_pos, to_pos, PieceChar.UNDEFINED))
+        if self.crazy:
+            pieceNames = sorted(set(piece._name for piece in self.getCrazyPlaceOptionsPieces()))
+            if pieceNames:
+                # the cells column by column
+                for pos in map(tuple, np.argwhere(self.getDropMap().T).tolist()):
+                    turns.extend((pos, pos, pieceName) for pieceName in pieceNames)
+        return turns
+
+    def makeMove(self, from_pos: tuple, to_pos: tuple, pieceName: str = PieceChar.QUEEN) -> str:
+        """
+        Plays a whole turn without any output and passes the turn to the other player.
+        The piece at 'from_pos' acts on 'to_pos' and a pawn reaching the last row
+        is promoted to 'pieceName'. If there is no piece at 'from_pos', a 'pieceName'
+        piece from the crazy pool is placed on 'to_pos' instead.
+        Returns the action taken, Outcome.GAME_FINISHED if the game is over (the result
+        is kept in 'outcome') or an empty string if the turn could not be played.
+        Every played turn can be taken back with unmakeMove.
+        """
+        piece = self.getPiece(from_pos)
+        if piece is None:
+            if not self.crazy or not self.restrictedCrazyPlace(to_pos) or \
+                pieceName not in [p._name for p in self.getCrazyPlaceOptionsPieces()]:
+                return ''
+            self.placePiece(to_pos, pieceName, False)
+            action = Outcome.GAME_FINISHED if self.playerWon() else self.action_log.get(-1).action
+        else:
+            if not self.selectablePiece(piece):
+                return ''
+            options_move, options_attack = self.getOptions(piece)
+            action = self.action(piece, to_pos, options_move, options_attack, False)
+            if not action:
+                return action
+            if action == Outcome.PAWN_PROMOTION:
+                self.placePiece(to_pos, pieceName, False)
+                action = Outcome.GAME_FINISHED if self.playerWon() else self.action_log.get(-1).action
+        if action == Outcome.GAME_FINISHED:
+            self.outcome = self.playerWon()
+        self.nextTurn(False)
+        return action
+
+    def unmakeMove(self) -> bool:
+        """
+        Takes back the last turn played (see makeMove), or the last action
+        or placement of the current turn.
+        Returns False if there is nothing left to take back.
+        """
+        if not self.undo_stack:
+            return False
+        record = self.undo_stack.pop()
+        self.outcome = Outcome.NONE
+        self.en_passant, self.halfmove_clock, self.fullmove_number = record.turn_state
+        if record.passed:
+            self.player_turn = not self.player_turn
+        self.action_log.pop()
+        self.forgetPosition()
+        piece = record.piece
+        if record.placed:
+            self.removePiece(piece)
+            self.pieces.remove(piece)
+            self.getPlayerPieces(piece).remove(piece)
+            if record.pool_piece:
+                self.getCrazyPlaceOptionsPieces().insert(record.pool_index, record.pool_piece)
+        if record.promoted:
+            promotedPiece = self.getPiece(piece.getPos())
+            self.removePiece(promotedPiece)
+            self.pieces.remove(promotedPiece)
+            self.getPlayerPieces(promotedPiece).remove(promotedPiece)
+            self.pieces.insert(record.promoted_indices[0], piece)
+            self.getPlayerPieces(piece).insert(record.promoted_indices[1], piece)
+            self.addPiece(piece)
+        if piece.getPos() != record.from_pos:
+            self.restorePiece(piece, record.from_pos, record.firstMove)
+        if record.rook:
+            self.restorePiece(record.rook, record.rook_pos, True)
+        if record.captured:
+            target = record.target
+            target.health += record.damage
+            self.pieces.insert(record.captured[0], target)
+            self.getPlayerPieces(target).insert(record.captured[1], target)
+            if target._player == Player.PLAYER_W:
+                self.white_casualties.pop()
+                self.white_crazyoptions.pop()
+            else:
+                self.black_casualties.pop()
+                self.black_crazyoptions.pop()
+            self.value_taken[self.player_turn] -= PieceValues.VALUES[target._name]
+            self.addPiece(target)
+        elif record.target:
+            self.damagePiece(record.target, -record.damage)
+        self.verifyBoard()
+        return True
     
-    def playerWonDefault(self) -> str:
+    def playerWonDefault(self, white: bool = None) -> str:
         """
-        Check for default Checkmate and Stalemate.
+        Check for default Checkmate and Stalemate of the enemy
+        of the player 'white' (by default the current player).
         """
+        if white is None:
+            white = self.player_turn
         outcome = Outcome.NONE
-        # temporarily switch player side
-        self.player_turn = not self.player_turn
-        enemyKing = self.king_pieces[self.player_turn]
-        options_move, options_attack = self.checkPinnedOptions(enemyKing, *enemyKing.getOptions(self.board))
-        # if the king has no legal moves left
-        if not (options_move + options_attack):
-            # check if any other piece has a legal move left
-            for piece in self.pieces:
-                if piece._player != self.currentPlayer():
-                    continue
-                options_move, options_attack = self.checkPinnedOptions(piece, *piece.getOptions(self.board, self.flippedAction()))
-                if (options_move + options_attack):
-                    break
-            else:
-                # if not it is stalemate or, if the king is currently threatened,
-                # it is checkmate
-                outcome = Outcome.STALEMATE
-                if self.isCellAttacked(enemyKing.getPos()):
-                    if self.player_turn:
-                        outcome = Outcome.BLACK_WON
+        enemy = not white
+        enemyKing = self.king_pieces[enemy]
+        # if neither the king nor any other piece has a legal move left
+        if not self.hasLegalOptions(enemy):
+            # it is stalemate or, if the king is currently threatened,
+            # it is checkmate
+            outcome = Outcome.STALEMATE
+            if self.isCellAttacked(enemyKing.getPos(), enemy):
+                if enemy:
+                    outcome = Outcome.BLACK_WON
+                else:
+                    outcome = Outcome.WHITE_WON
+            if self.crazy:
+                placementOptions = self.getCrazyPlaceOptionsPieces(enemy)
+                if placementOptions:
+                    if outcome == Outcome.STALEMATE:
+                        outcome = Outcome.NONE
                     else:
-                        outcome = Outcome.WHITE_WON
-                if self.crazy:
-                    placementOptions = self.getCrazyPlaceOptionsPieces()
-                    if placementOptions:
-                        if outcome == Outcome.STALEMATE:
+                        if self.getDropMask(enemy):
                             outcome = Outcome.NONE
-                        else:
-                            for pos in product(range(config.DIMENSION[1]), range(config.DIMENSION[0])):
-                                if self.board[pos[1], pos[0]] != 0:
-                                    continue
-                                if self._restrictedCrazyPlaceDefault(pos):
-                                    outcome = Outcome.NONE
-                                    break
-                        
-                
-        # switch back to actual player
-        self.player_turn = not self.player_turn
         return outcome
     
     def gameIsDraw(self):
         outcome = Outcome.NONE
         #by repitition
 
-        if len(self.action_log.boards) and np.all(self.action_log.boards[-1] == self.action_log.boards, axis=(-1,1)).sum() == 3:
+        if self.position_history and self.position_counts[self.position_history[-1]] >= 3:
             outcome = Outcome.DRAW_REPITITION
         
         if self.crazy:
@@ -439,91 +794,81 @@ class GameState:
         
         return outcome
     
-    def playerWon(self) -> str:
+    def playerWon(self, white: bool = None) -> str:
         """
         Checks if a player has won, by successfully defeating the
-        enemy king.
+        enemy king, after the player 'white' (by default the current player) acted.
         Returns 'white' or 'black' according to the team that won,
         or returns an empty string if no team has won yet.
         """
+        if white is None:
+            white = self.player_turn
         if self.default:
             gameDraw = self.gameIsDraw()
             if gameDraw:
                 return gameDraw
-            gameWon = self.playerWonDefault()
+            gameWon = self.playerWonDefault(white)
             return gameWon
         outcome = Outcome.NONE
-        if (self.king_pieces[not self.player_turn].health <= 0):
-            if self.player_turn:
+        if (self.king_pieces[not white].health <= 0):
+            if white:
                 outcome = Outcome.WHITE_WON
             else:
                 outcome = Outcome.BLACK_WON
         return outcome
 
-    def _restrictedCrazyPlaceDefault(self, pos: tuple) -> bool:
+    def getDropMask(self, white: bool = None) -> int:
         """
-        check if the friendly king would be threatened even with the
-        newly placed piece.
+        Returns the mask of all cells the player 'white' (by default the current
+        player) is allowed to place a 'crazy' - piece on (see BitBoard).
+        Cached until the board changes.
         """
-        placementAllowed = False
-        # temporarily block the position in question on the board
-        self.board[pos[1],pos[0]] = pieceTranslateDic[PieceChar.OBSTACLE]
-        # get the position of the current king
-        friendlyKingPos = self.king_pieces[self.player_turn].getPos()
-        
-        for piece in self.pieces:
-            if piece._player == self.currentPlayer():
-                continue
-            options_move, options_attack = piece.getOptions(self.board, not self.flippedAction())
-            # if an enemy piece threatens king, the placement is not allowed
-            if friendlyKingPos in (options_move + options_attack):
-                break
-        else:
-            # if no enemy piece threatens the king, the placement is allowed
-            placementAllowed = True
+        if white is None:
+            white = self.player_turn
+        cache = self.getBoardCache()
+        key = ('drops', white)
+        if key not in cache:
+            # the position has to be empty
+            drops = ~self.bitboards.occupied & ((1 << (config.DIMENSION[0] * config.DIMENSION[1])) - 1)
+            # in default mode the placed piece must not leave the king in check.
+            # It never attacks, so it is only able to block a single check
+            # (see getLegality, the evasion mask is full if the king is not in check)
+            if self.default:
+                _, evasion, _ = self.getLegality(white)
+                drops &= evasion
+            cache[key] = drops
+        return cache[key]
 
-        # reset the position
-        self.board[pos[1],pos[0]] = 0
-        return placementAllowed
+    def getDropMap(self, white: bool = None) -> np.ndarray:
+        """
+        Returns the cells allowed for a 'crazy' - piece placement (see getDropMask)
+        as a read-only boolean numpy-array in the shape of the board.
+        """
+        if white is None:
+            white = self.player_turn
+        cache = self.getBoardCache()
+        key = ('drop map', white)
+        if key not in cache:
+            dropMap = self.bitboards.toArray(self.getDropMask(white))
+            dropMap.flags.writeable = False
+            cache[key] = dropMap
+        return cache[key]
 
-    def restrictedCrazyPlace(self, pos: tuple) -> bool:
+    def restrictedCrazyPlace(self, pos: tuple, white: bool = None) -> bool:
         """
         check if a 'crazy' - piece placement is allowed at position 'pos'
+        for the player 'white' (by default the current player).
         """
-        piece = self.getPiece(pos)
-        # the position has to be empty
-        if piece:
-            return False
-        # it only matters in default mode
-        if not self.default:
-            return True
-        return self._restrictedCrazyPlaceDefault(pos)
+        return bool((self.getDropMask(white) >> self.cellIndex(pos)) & 1)
     
     def checkPinnedOptions(self, piece: Piece, options_move: list, options_attack: list) -> tuple:
         """
         check if a piece is pinned such that it cannot move without exposing the king to attacks.
+        The pins and checks are taken from getLegality instead of trying out every option.
         """
-        backup_values = (piece.getPos(), self.board[piece.cell_row, piece.cell_col])
-        self.board[piece.cell_row, piece.cell_col] = 0
-        for i in range(len(options_move)-1, -1, -1):
-            self.board[options_move[i][1],options_move[i][0]] = backup_values[1]
-            piece.setPos(options_move[i])
-            if self.isCellAttacked(self.king_pieces[self.player_turn].getPos()):
-                self.board[options_move[i][1],options_move[i][0]] = 0
-                del options_move[i]
-                continue
-            self.board[options_move[i][1],options_move[i][0]] = 0
-        for i in range(len(options_attack)-1, -1, -1):
-            prev_value = self.board[options_attack[i][1],options_attack[i][0]]
-            self.board[options_attack[i][1],options_attack[i][0]] = backup_values[1]
-            piece.setPos(options_attack[i])
-            if self.isCellAttacked(self.king_pieces[self.player_turn].getPos()):
-                self.board[options_attack[i][1],options_attack[i][0]] = prev_value
-                del options_attack[i]
-                continue
-            self.board[options_attack[i][1],options_attack[i][0]] = prev_value
-        piece.setPos(backup_values[0])
-        self.createBoard()
+        legal = self.getLegalMask(piece, self.bitboards.toMask(options_move + options_attack))
+        options_move = [pos for pos in options_move if (legal >> self.cellIndex(pos)) & 1]
+        options_attack = [pos for pos in options_attack if (legal >> self.cellIndex(pos)) & 1]
         return (options_move, options_attack)
 
     def getOptions(self, piece: Piece) -> tuple:
@@ -533,17 +878,38 @@ class GameState:
         """
         if not piece:
             return ([], [])
-        options_move, options_attack = piece.getOptions(self.board, self.flippedAction())
+        options_move, options_attack = self.getPieceOptions(piece, self.pawnFlip(piece._player == Player.PLAYER_W))
+        enPassantOptions = self.getEnPassantOptions(piece)
         if self.default:
             options_move, options_attack = self.checkPinnedOptions(piece, options_move, options_attack)
-            
-        options_attack.extend(self.getEnPassantOptions(piece))
+            enPassantOptions = [pos for pos in enPassantOptions if self.isLegalEnPassant(piece, pos)]
+
+        options_attack.extend(enPassantOptions)
         castleOptions = self.getCastleOptions(piece)
         for castleOption, _, _ in castleOptions:
             options_move.append(castleOption)
 
         return (options_move, options_attack)
 
+    def getPieceOptions(self, piece: Piece, flip: bool = True) -> tuple:
+        """
+        Returns the tuple of movement- and attack-lists of a 'piece' on the
+        current board, generated by the selected backend.
+        """
+        if self.bitboard:
+            return self.bitboards.getOptions(piece.getPos(), piece._name, piece.firstMove, flip)
+        return piece.getOptions(self.board, flip)
+
+    def getPieceOptionMasks(self, piece: Piece, flip: bool = True) -> tuple:
+        """
+        Returns the movement- and attack-options of a 'piece' as
+        masks (see BitBoard), generated by the selected backend.
+        """
+        if self.bitboard:
+            return self.bitboards.getOptionMasks(self.cellIndex(piece.getPos()), piece._name, piece.firstMove, flip)
+        options_move, options_attack = piece.getOptions(self.board, flip)
+        return (self.bitboards.toMask(options_move), self.bitboards.toMask(options_attack))
+
     def getCastleOptions(self, piece: Piece) -> list:
         """
         Takes a 'piece' and checks if it has the option to castle.
@@ -552,35 +918,28 @@ class GameState:
         the target-position for the rook, aswell as the rook itself.
         """
         options = []
-        # current piece must be king
-        if piece._name != PieceChar.KING or not piece.firstMove:
+        # current piece must be king, that has never moved
+        if piece._name != PieceChar.KING:
             return options
-        # left castle demands rook at left-most position
-        if abs(self.board[piece.cell_row, 0]) == pieceTranslateDic[PieceChar.ROOK]:
-            rook = self.getPiece((0, piece.cell_row))
-            # rook must never have moved and no pieces between rook and king
-            if (rook.firstMove) and (np.all(self.board[piece.cell_row, 1:piece.cell_col] == 0)):
-                if self.default:
-                    for x in range(0, piece.cell_col+1):
-                        if self.isCellAttacked((x, piece.cell_row)):
-                            break
-                    else:
-                        options.append(((piece.cell_col-2, piece.cell_row), (piece.cell_col-1, piece.cell_row), rook))
-                else:
-                    options.append(((piece.cell_col-2, piece.cell_row), (piece.cell_col-1, piece.cell_row), rook))
-        # right castle demands rook at right-most position
-        if abs(self.board[piece.cell_row, config.DIMENSION[1]-1]) == pieceTranslateDic[PieceChar.ROOK]:
-            rook = self.getPiece((config.DIMENSION[1]-1, piece.cell_row))
-            # rook must never have moved and no pieces between rook and king
-            if (rook.firstMove) and (np.all(self.board[piece.cell_row, piece.cell_col+1:config.DIMENSION[1]-1] == 0)):
-                if self.default:
-                    for x in range(piece.cell_col, config.DIMENSION[0]):
-                        if self.isCellAttacked((x, piece.cell_row)):
-                            break
-                    else:
-                        options.append(((piece.cell_col+2, piece.cell_row), (piece.cell_col+1, piece.cell_row), rook))
-                else:           
-                    options.append(((piece.cell_col+2, piece.cell_row), (piece.cell_col+1, piece.cell_row), rook))
+        white = piece._player == Player.PLAYER_W
+        rights = self.castling_rights & self.bitboards.colors[white]
+        if not (rights >> self.cellIndex(piece.getPos())) & 1:
+            return options
+        rooks = rights & self.bitboards.types[pieceTranslateDic[PieceChar.ROOK]]
+        col, row = piece.getPos()
+        # left castle demands a rook at the left-most position, right castle at the right-most position
+        for rookCol, step in ((0, -1), (config.DIMENSION[1]-1, 1)):
+            # the rook must never have moved and there must be room for the king to move two cells
+            if abs(rookCol - col) < 3 or not (rooks >> self.cellIndex((rookCol, row))) & 1:
+                continue
+            low, high = min(col, rookCol), max(col, rookCol)
+            # no pieces between rook and king
+            if self.bitboards.occupied & self.getRowMask(row, low+1, high):
+                continue
+            # in default mode no cell from the king to the rook may be attacked
+            if self.default and self.getAttackMap(not white) & self.getRowMask(row, low, high+1):
+                continue
+            options.append(((col + 2*step, row), (col + step, row), self.getPiece((rookCol, row))))
         return options
 
     def getEnPassantOptions(self, piece: Piece) -> list:
@@ -591,53 +950,40 @@ class GameState:
         tuple (x, y) representing the target cell.
         """
         options = []
-        # current piece must be Pawn
-        if not self.action_log.actions or piece._name != PieceChar.PAWN:
+        # current piece must be Pawn and the last action the double step of a pawn
+        if self.en_passant is None or piece._name != PieceChar.PAWN:
             return options
-        last_move = self.translateActionRepr(self.action_log.get(-1))
-        from_col, from_row = last_move[0]
-        to_col, to_row = last_move[1]
-        # last move must be 2-square move forward
-        if abs(from_row - to_row) != 2 or (from_col - to_col) != 0:
-            return options 
-        # last Piece must be enemy Pawn
-        if self.board[piece.cell_row, piece.cell_col] == -self.board[to_row, to_col]:
-            # enemy pawn at correct position
-            if (to_col, to_row) == (piece.cell_col-1, piece.cell_row) or \
-                (to_col, to_row) == (piece.cell_col+1, piece.cell_row):
-                options.append((to_col, to_row + (1 if self.flippedAction() else -1)))
+        col, row = self.en_passant
+        forward = 1 if self.pawnFlip(piece._player == Player.PLAYER_W) else -1
+        # the enemy pawn stands next to the piece, which attacks the cell the pawn has skipped
+        if abs(col - piece.cell_col) == 1 and row == piece.cell_row + forward and \
+                self.board[piece.cell_row, piece.cell_col] == -self.board[piece.cell_row, col]:
+            options.append(self.en_passant)
         return options
 
     def flippedAction(self) -> bool:
         """
-        Some actions are upside down if the current player is black
-        and the board is not flipped or if the current player is white
-        and the board is flipped.
+        Some actions are upside down if the current player is black.
         e.g.: Pawn moves/attacks + enPassant + checkmate checking
         """
-        return self.board_flipped == self.player_turn
+        return not self.player_turn
 
-    def isBoardFlipped(self) -> bool:
-        return self.board_flipped
+    def pawnFlip(self, white: bool) -> bool:
+        """
+        pawns of black walk downwards.
+        """
+        return not white
 
-    def flipBoard(self) -> None:
+    def getPieceID(self, piece: Piece) -> int:
         """
-        flips the gameboard, by mirroring the
-        x,y coordinates of all pieces at the center
-        of the board.
+        returns the number identifier of a 'piece' on the board,
+        negative for black pieces.
         """
-        if not self.flip_board:
-            return
-        self.board_flipped = not self.board_flipped
-        self.alpha_identifiers.reverse()
-        self.numbers_identifiers.reverse()
-        for piece in self.pieces:
-            piece.cell_col = config.DIMENSION[1] - piece.cell_col - 1
-            piece.cell_row = config.DIMENSION[0] - piece.cell_row - 1
+        return pieceTranslateDic[piece._name] * (1 if piece._player == Player.PLAYER_W else -1)
 
-    def createBoard(self) -> None:
+    def buildBoard(self) -> np.ndarray:
         """
-        Creates the gameboard as a numpy.ndarray representation.
+        Builds the gameboard as a numpy.ndarray representation.
         Each piece has a unique number identifier stored in 'pieceTranslateDic'.
         e.g.: startingPosition:
         [[-4. -3. -2. -5. -6. -2. -3. -4.]       
@@ -649,20 +995,223 @@ class GameState:
         [ 1.  1.  1.  1.  1.  1.  1.  1.]       
         [ 4.  3.  2.  5.  6.  2.  3.  4.]]
         """
-        self.board = np.zeros(config.DIMENSION, dtype=config.boardDtype)
+        board = np.zeros(config.DIMENSION, dtype=config.boardDtype)
+        for piece in self.pieces:
+            board[piece.cell_row, piece.cell_col] = self.getPieceID(piece)
+        return board
+
+    def getPieceStore(self) -> PieceStore:
+        """
+        returns the pieces on the board as arrays, e.g. to copy, hash or save the position.
+        """
+        return PieceStore.fromPieces(self.pieces)
+
+    def loadPieceStore(self, store: PieceStore) -> None:
+        """
+        replace the pieces on the board by new pieces from the 'store'.
+        The undo stack, the action log and the counted positions are dropped,
+        because they refer to the replaced pieces.
+        """
+        self.pieces = store.toPieces()
+        self.white_pieces = [piece for piece in self.pieces if piece._player == Player.PLAYER_W]
+        self.black_pieces = [piece for piece in self.pieces if piece._player == Player.PLAYER_B]
+        self.king_pieces = [None, None]
+        for piece in self.pieces:
+            if piece._name == PieceChar.KING:
+                self.king_pieces[piece._player == Player.PLAYER_W] = piece
+        self.action_log = ActionLog()
+        self.undo_stack = []
+        self.position_counts, self.position_history = {}, []
+        self.outcome = Outcome.NONE
+        self.en_passant = None
+        self.createBoard()
+
+    def getSnapshot(self) -> Snapshot:
+        """
+        returns a read-only copy of the current position, which stays valid while the game goes on.
+        As long as the position does not change the same snapshot is returned.
+        (e.g. gameState.loadSnapshot(snapshot) on a new GameState to analyse the position)
+        """
+        key = (self.board_version, self.zobrist_hash, self.player_turn, len(self.undo_stack))
+        if key != self.snapshot_key:
+            self.snapshot = Snapshot(self.board.copy(), self.getPieceStore(), self.player_turn,
+                                     self.getLastMove() if self.action_log else None, self.getTurnState(),
+                                     self.getPositionHash(), self.outcome,
+                                     tuple(piece._name for piece in self.white_crazyoptions),
+                                     tuple(piece._name for piece in self.black_crazyoptions),
+                                     tuple(self.value_taken), tuple(self.health_damage_dict.items()))
+            self.snapshot_key = key
+        return self.snapshot
+
+    def loadSnapshot(self, snapshot: Snapshot) -> None:
+        """
+        set up the position of a 'snapshot' (see loadPieceStore). Only the last move
+        of the game is kept.
+        """
+        self.loadPieceStore(snapshot.pieces)
+        self.player_turn = snapshot.player_turn
+        self.outcome = snapshot.outcome
+        self.white_crazyoptions = [createPiece(name, (0, 0), Player.PLAYER_W) for name in snapshot.white_pool]
+        self.black_crazyoptions = [createPiece(name, (0, 0), Player.PLAYER_B) for name in snapshot.black_pool]
+        self.value_taken = list(snapshot.value_taken)
+        self.health_damage_dict = dict(snapshot.health_damage)
+        self.en_passant, self.halfmove_clock, self.fullmove_number = snapshot.turn_state
+        if snapshot.last_move is not None:
+            self.action_log.add(self.board, *snapshot.last_move, ActionName.MOVES, '')
+            self.recordPosition()
+
+    def createBoard(self) -> None:
+        """
+        (Re-)creates the gameboard from scratch. Afterwards the board
+        is only changed by deltas (see setCell).
+        """
+        self.board = self.buildBoard()
+        self.bitboards = BitBoard(self.board)
+        self.board_version += 1
+        self.piece_map = {piece.getPos(): piece for piece in self.pieces}
+        self.zobrist_hash = 0
+        self.castling_rights = 0
         for piece in self.pieces:
-            self.board[piece.cell_row, piece.cell_col] = pieceTranslateDic[piece._name] * (
-                1 if piece._player == Player.PLAYER_W else -1
-            )
+            self.zobrist_hash ^= self.getPieceHash(piece)
+            if piece.firstMove and piece._name in CASTLING_PIECES:
+                self.castling_rights |= 1 << self.cellIndex(piece.getPos())
+
+    def getBoardCache(self) -> dict:
+        """
+        returns a dictionary to cache values of the current position.
+        It is emptied as soon as the board changes.
+        """
+        if self.board_cache_version != self.board_version:
+            self.board_cache = {}
+            self.board_cache_version = self.board_version
+        return self.board_cache
+
+    def verifyBoard(self) -> None:
+        """
+        in debug mode compare the incrementally updated board,
+        piece index and zobrist hash against a full rebuild.
+        """
+        if not self.debug:
+            return
+        board = self.buildBoard()
+        assert np.array_equal(self.board, board), \
+            f"The board is out of sync:\n{self.board}\nexpected:\n{board}"
+        bitboards = BitBoard(board)
+        assert (self.bitboards.colors, self.bitboards.types) == (bitboards.colors, bitboards.types), \
+            "The bitboards are out of sync."
+        assert self.piece_map == {piece.getPos(): piece for piece in self.pieces}, \
+            "The piece index is out of sync."
+        zobrist_hash = 0
+        for piece in self.pieces:
+            zobrist_hash ^= self.getPieceHash(piece)
+        assert self.zobrist_hash == zobrist_hash, "The zobrist hash is out of sync."
+        castling_rights = 0
+        for piece in self.pieces:
+            if piece.firstMove and piece._name in CASTLING_PIECES:
+                castling_rights |= 1 << self.cellIndex(piece.getPos())
+        assert self.castling_rights == castling_rights, "The castling rights are out of sync."
+
+    def cellIndex(self, pos: tuple) -> int:
+        """
+        returns the index of the cell at position 'pos' (x, y) on the bitboards.
+        """
+        return pos[1] * config.DIMENSION[1] + pos[0]
+
+    def getRowMask(self, row: int, start: int, stop: int) -> int:
+        """
+        returns the mask of the cells from the column 'start' up to (excluding) 'stop' of a 'row'.
+        """
+        return ((1 << (stop - start)) - 1) << self.cellIndex((start, row))
+
+    def setCell(self, pos: tuple, pieceID: int) -> None:
+        """
+        write the 'pieceID' onto the cell at position 'pos' (x, y)
+        of the board and its bitboards.
+        """
+        self.bitboards.setCell(self.cellIndex(pos), int(self.board[pos[1], pos[0]]), int(pieceID))
+        self.board[pos[1], pos[0]] = pieceID
+        self.board_version += 1
+
+    def addPiece(self, piece: Piece) -> None:
+        """
+        put a 'piece' onto the board at its position.
+        """
+        self.setCell(piece.getPos(), self.getPieceID(piece))
+        self.piece_map[piece.getPos()] = piece
+        self.zobrist_hash ^= self.getPieceHash(piece)
+        if piece.firstMove and piece._name in CASTLING_PIECES:
+            self.castling_rights |= 1 << self.cellIndex(piece.getPos())
+
+    def removePiece(self, piece: Piece) -> None:
+        """
+        take a 'piece' off the board.
+        """
+        self.zobrist_hash ^= self.getPieceHash(piece)
+        del self.piece_map[piece.getPos()]
+        self.castling_rights &= ~(1 << self.cellIndex(piece.getPos()))
+        self.setCell(piece.getPos(), 0)
+
+    def movePiece(self, piece: Piece, to_pos: tuple) -> None:
+        """
+        move a 'piece' to the position 'to_pos' and apply
+        the change to the board.
+        """
+        self.removePiece(piece)
+        piece.move(to_pos)
+        self.addPiece(piece)
+
+    def restorePiece(self, piece: Piece, pos: tuple, firstMove: bool) -> None:
+        """
+        put a 'piece' back onto the position 'pos' with the given 'firstMove' flag.
+        """
+        self.removePiece(piece)
+        piece.setPos(pos)
+        piece.firstMove = firstMove
+        self.addPiece(piece)
+
+    def damagePiece(self, piece: Piece, damage: int) -> None:
+        """
+        reduce the health of a 'piece' that stays on the board.
+        """
+        self.zobrist_hash ^= self.getPieceHash(piece)
+        piece.health -= damage
+        self.zobrist_hash ^= self.getPieceHash(piece)
+
+    def getPieceHash(self, piece: Piece) -> int:
+        """
+        returns the zobrist key of a 'piece' on its current position.
+        """
+        idx = self.cellIndex(piece.getPos())
+        pieceHash = self.zobrist.pieces[idx][self.getPieceID(piece)]
+        if piece.firstMove and piece._name in RIGHTS_PIECES:
+            pieceHash ^= self.zobrist.unmoved[idx]
+        if self.hash_health:
+            pieceHash ^= self.zobrist.health(idx, piece.health)
+        return pieceHash
+
+    def getPositionHash(self) -> int:
+        """
+        returns the zobrist hash of the current position, including
+        the player to move and the column of a possible en Passant attack.
+        """
+        positionHash = self.zobrist_hash
+        if not self.player_turn:
+            positionHash ^= self.zobrist.black_turn
+        if self.en_passant is not None:
+            positionHash ^= self.zobrist.en_passant[self.en_passant[0]]
+        return positionHash
 
     def nextTurn(self, displayInfo = True) -> None:
         """
-        flips the board and switches to the team whose
+        switches to the team whose
         turn it is at the moment.
         """
         self.player_turn = not self.player_turn
-        self.flipBoard()
-        self.createBoard()
+        if self.player_turn:
+            self.fullmove_number += 1
+        self.verifyBoard()
+        if self.undo_stack:
+            self.undo_stack[-1].passed = True
         if not displayInfo:
             return
         print(self)
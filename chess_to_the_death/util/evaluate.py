@@ -0,0 +1,70 @@
+import numpy as np
+
+import chess_to_the_death.util.kernels as kernels
+from chess_to_the_death.util.engine import GameState
+from chess_to_the_death.util.bitboard import KING, KING_OFFSETS
+from chess_to_the_death.util.definition import PieceNames, PieceValues, pieceTranslateDic
+
+
+# the value of a piece indexed by the absolute id on the board (see pieceTranslateDic)
+PIECE_VALUES = np.array([PieceValues.VALUES[pieceTranslateDic[id]] for id in range(len(PieceNames.NAMES))],
+                        dtype=np.float64)
+# the score of a single move or attack more than the enemy (in piece values, a pawn is worth 1)
+MOBILITY_WEIGHT = 0.05
+# the score of the king being threatened by the enemy (see getKingDanger)
+KING_SAFETY_WEIGHT = 0.5
+
+
+def getPieceArrays(gameState: GameState) -> tuple:
+    """
+    returns the health, maximum health and damage of the pieces of a gameState
+    as arrays in the shape of its board (zero on the empty cells).
+    """
+    store = gameState.getPieceStore()
+    return tuple(store.getArray(field).astype(np.float64) for field in ('health', 'maxHealth', 'damage'))
+
+
+def getMaterial(boards: np.ndarray, health: np.ndarray = None, maxHealth: np.ndarray = None) -> np.ndarray:
+    """
+    returns the piece values of white minus the piece values of black on each board.
+    If the 'health' and 'maxHealth' of the pieces are given, each value is weighted
+    by the health left (like search.evaluate).
+    """
+    values = PIECE_VALUES[np.abs(boards)] * np.sign(boards)
+    if health is not None and maxHealth is not None:
+        values = values * np.divide(health, maxHealth, out=np.zeros(values.shape), where=maxHealth > 0)
+    return values.sum(axis=(-2, -1))
+
+
+def getKingDanger(boards: np.ndarray, white: bool, health: np.ndarray = None, damage: np.ndarray = None) -> np.ndarray:
+    """
+    returns how much the enemy threatens the king of a player and the cells around it on each board.
+    Without the 'health' and 'damage' of the pieces the attacks are counted, otherwise the damage
+    of the attacks is summed and measured in multiples of the health of the king.
+    """
+    kings = kernels.getPlayerMask(boards, white) & (np.abs(boards) == KING)
+    zone = kings | (kernels.leaperCounts(kings, KING_OFFSETS) > 0)
+    weights = None if damage is None or health is None else damage
+    attacks = kernels.attackCounts(boards, not white, weights=weights)
+    danger = (attacks * zone).sum(axis=(-2, -1))
+    if weights is None:
+        return danger.astype(np.float64)
+    kingHealth = (health * kings).sum(axis=(-2, -1))
+    return np.divide(danger, kingHealth, out=np.zeros(np.shape(danger)), where=kingHealth > 0)
+
+
+def evaluateBoards(boards: np.ndarray, health: np.ndarray = None, maxHealth: np.ndarray = None,
+                   damage: np.ndarray = None, white=True) -> np.ndarray:
+    """
+    returns the score of every position of a stack of boards (N, height, width) in one pass,
+    or of a single board. 'health', 'maxHealth' and 'damage' hold the values of the piece
+    on each cell in the shape of the 'boards' and are left out for the default variant.
+    The score combines the (health weighted) material, the mobility and the king safety of
+    both players and is given for the player 'white' (a bool or a bool per board).
+    """
+    boards = np.asarray(boards)
+    score = getMaterial(boards, health, maxHealth)
+    score += MOBILITY_WEIGHT * (kernels.mobility(boards, True) - kernels.mobility(boards, False))
+    score += KING_SAFETY_WEIGHT * (getKingDanger(boards, False, health, damage) -
+                                   getKingDanger(boards, True, health, damage))
+    return np.where(white, score, -score)
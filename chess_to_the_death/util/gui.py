@@ -2,6 +2,7 @@ from os import environ
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = 'hide'  # sorry, pygame
 
 import pygame
+from functools import partial
 from itertools import product
 
 import chess_to_the_death.parser.argparser as argparser
@@ -10,7 +11,9 @@ import chess_to_the_death.util.engine as engine
 import chess_to_the_death.util.config as config
 from chess_to_the_death.entity.pieces import Piece  # only for type-hints
 from chess_to_the_death.util.loader import loadImage, clearPieceImageCache
-from chess_to_the_death.util.definition import Outcome, PieceChar
+from chess_to_the_death.util.search import Searcher, getTurnScore
+from chess_to_the_death.util.worker import EngineWorker, ENGINE_DONE
+from chess_to_the_death.util.definition import Outcome, PieceChar, promotionOptions
 
 
 CELL_SIZE, HALF_CELL_SIZE = None, None
@@ -19,6 +22,8 @@ BOARD_SIZE = None
 IMG_SIZE, IMAGE_OFFSET = None, None
 
 PLACEPIECE_QUIT, PLACEPIECE_PLACED, PLACEPIECE_ABORTED = range(3)
+# the options cache is cleared, once it holds options for this many pieces
+OPTIONS_CACHE_SIZE = 50000
 
 COLORS = [(230, 230, 230), #"#E6E6E6" -> WHITE / CELL + HOVER
           ( 45,  46,  48), #"#202124" -> DARK_GRAY / CELL + HOVER
@@ -63,11 +68,22 @@ class Holder:
     winner: str = ''
     options_move, options_attack = [], []
     last_move = []
+    # Computer
+    # the player_turn the computer plays (None if both players are human)
+    computer: bool = None
+    searcher: Searcher = None
+    # runs the actions and searches, while the gui keeps handling events
+    worker: EngineWorker = None
+    # the options of pieces computed while the gui is idle, by position and piece position
+    options_cache = {}
+    precompute = None
     # Planning
     marked_cells_circle = set()
     marked_cells_square = set()
     planning_arrows = []
     # GUI
+    # the board is drawn upside down (black at the bottom)
+    view_flipped: bool = False
     attack_icon: pygame.Surface = None
     fps: fpsClock = None
     # Args
@@ -94,6 +110,27 @@ def getMouseCell(halfCell: bool = False) -> tuple:
     return (col // CELL_SIZE[0], row // CELL_SIZE[1])
 
 
+def viewPos(pos: tuple) -> tuple:
+    """
+    converts a position (x, y) on the board into the cell it is drawn on
+    and vice versa, depending on whether the view is flipped.
+    """
+    if not holder.view_flipped:
+        return pos
+    return (config.DIMENSION[1] - pos[0] - 1, config.DIMENSION[0] - pos[1] - 1)
+
+
+def updateView(gameState: engine.GameState) -> None:
+    """
+    the board is drawn from the perspective of the player whose turn it is,
+    or of the human player, if the computer plays the other side.
+    """
+    if holder.computer is None:
+        holder.view_flipped = argparser.FLIP_BOARD and not gameState.player_turn
+    else:
+        holder.view_flipped = argparser.FLIP_BOARD and holder.computer
+
+
 def draw_polygon_alpha(mainScreen: pygame.Surface, color: tuple, points: list, alpha: int = 150) -> None:
     """
     Draw a polygon from 'points' on the 'mainScreen'.
@@ -170,9 +207,13 @@ def drawIdentifiers(mainScreen: pygame.Surface, gameState: engine.GameState) ->
     # Scale the Font according to the CELL_SIZE
     font = pygame.font.SysFont("Verdana", int(16 * (min(CELL_SIZE)/128)))
 
+    numbers_identifiers, alpha_identifiers = gameState.numbers_identifiers, gameState.alpha_identifiers
+    if holder.view_flipped:
+        numbers_identifiers, alpha_identifiers = numbers_identifiers[::-1], alpha_identifiers[::-1]
+
     # Draw the Number-Identifiers at the right side
     for i in range(config.DIMENSION[0]):
-        text = font.render(gameState.numbers_identifiers[i], True, COLORS[6])
+        text = font.render(numbers_identifiers[i], True, COLORS[6])
         text_size = (text.get_width(), text.get_height())
         text_location = pygame.Rect(IDENTIFIER_OFFSET[0] + (BOARD_OFFSET[0] - text_size[0]) // 2,
                                     (i * CELL_SIZE[1]) +
@@ -183,7 +224,7 @@ def drawIdentifiers(mainScreen: pygame.Surface, gameState: engine.GameState) ->
 
     # Draw the Letter-Identifiers at the bottom
     for i in range(config.DIMENSION[1]):
-        text = font.render(gameState.alpha_identifiers[i], True, COLORS[6])
+        text = font.render(alpha_identifiers[i], True, COLORS[6])
         text_size = (text.get_width(), text.get_height())
         text_location = pygame.Rect((i * CELL_SIZE[0]) + HALF_CELL_SIZE[0] - (text_size[0] // 2),
                                     IDENTIFIER_OFFSET[1] +
@@ -222,38 +263,38 @@ def circleCell(mainScreen: pygame.Surface, pos: tuple, color: tuple, alpha: int
     mainScreen.blit(shape_surf, target_rect)
 
 
-def highlightLastMovedCell(mainScreen: pygame.Surface, cell: tuple) -> None:
+def highlightLastMovedCell(mainScreen: pygame.Surface, pos: tuple, cell: tuple) -> None:
     """
     highlight the cell that is currently selected.
     """
-    if cell not in holder.last_move:
+    if pos not in holder.last_move:
         return
     highlightCell(mainScreen, cell, COLORS[9])
 
 
-def highlightSelectedCell(mainScreen: pygame.Surface, cell: tuple) -> None:
+def highlightSelectedCell(mainScreen: pygame.Surface, pos: tuple, cell: tuple) -> None:
     """
     highlight the cell that is currently selected.
     """
-    if cell != holder.selectedPiece.getPos():
+    if pos != holder.selectedPiece.getPos():
         return
     highlightCell(mainScreen, cell, COLORS[3])
 
 
-def highlightMoveOptions(mainScreen: pygame.Surface, cell: tuple) -> None:
+def highlightMoveOptions(mainScreen: pygame.Surface, pos: tuple, cell: tuple) -> None:
     """
     highlight a cell if it's position is valid for movement
     """
-    if cell not in holder.options_move:
+    if pos not in holder.options_move:
         return
     highlightCell(mainScreen, cell, COLORS[4])
 
 
-def highlightAttackOptions(mainScreen: pygame.Surface, cell: tuple) -> None:
+def highlightAttackOptions(mainScreen: pygame.Surface, pos: tuple, cell: tuple) -> None:
     """
     highlight a cell if it's position is valid for attack
     """
-    if cell not in holder.options_attack:
+    if pos not in holder.options_attack:
         return
     highlightCell(mainScreen, cell, COLORS[5])
 
@@ -289,11 +330,11 @@ def highlightHoveredCell(mainScreen: pygame.Surface, hoveredCell: tuple, cell: t
 
 def drawPiece(mainScreen: pygame.Surface, piece: Piece, cell: tuple) -> None:
     """
-    draw a single piece.image on the mainScreen, including health- and damage-values
+    draw the image of a single piece on the mainScreen, including health- and damage-values
     """
     if not piece:
         return
-    mainScreen.blit(piece.image,
+    mainScreen.blit(loadImage(piece._player + piece._name, IMG_SIZE),
                     pygame.Rect(cell[0] * CELL_SIZE[0] + IMAGE_OFFSET[0],
                                 cell[1] * CELL_SIZE[1] + IMAGE_OFFSET[1],
                                 *IMG_SIZE))
@@ -328,26 +369,28 @@ def drawPiece(mainScreen: pygame.Surface, piece: Piece, cell: tuple) -> None:
     mainScreen.blit(text, text_location)
 
 
-def drawGameCell(mainScreen: pygame.Surface, gameState: engine.GameState, cell: tuple) -> None:
+def drawGameCell(mainScreen: pygame.Surface, gameState: engine.GameState, pos: tuple) -> None:
     """
     draw a single cell on the mainScreen, including all it's possible states.
+    'pos' is the position on the board, which is drawn on the cell viewPos(pos).
     """
-    if not (0 <= cell[0] < config.DIMENSION[1]) or \
-            not (0 <= cell[1] < config.DIMENSION[0]):
+    if not (0 <= pos[0] < config.DIMENSION[1]) or \
+            not (0 <= pos[1] < config.DIMENSION[0]):
         return
+    cell = viewPos(pos)
     cellSquare = pygame.Rect(cell[0] * CELL_SIZE[0],
                              cell[1] * CELL_SIZE[1],
                              *CELL_SIZE)
     drawBoardCell(mainScreen, cell, cellSquare)
-    highlightLastMovedCell(mainScreen, cell)
+    highlightLastMovedCell(mainScreen, pos, cell)
     if holder.selectedPiece:
-        highlightSelectedCell(mainScreen, cell)
-        highlightMoveOptions(mainScreen, cell)
-        highlightAttackOptions(mainScreen, cell)
+        highlightSelectedCell(mainScreen, pos, cell)
+        highlightMoveOptions(mainScreen, pos, cell)
+        highlightAttackOptions(mainScreen, pos, cell)
     highlightMarkedCellSquare(mainScreen, cell)
     if holder.highlight_cells:
         highlightHoveredCell(mainScreen, getMouseCell(), cell)
-    drawPiece(mainScreen, gameState.getPiece(cell), cell)
+    drawPiece(mainScreen, gameState.getPiece(pos), cell)
     highlightMarkedCellCircle(mainScreen, cell)
     pygame.display.update(cellSquare)
 
@@ -394,7 +437,7 @@ def clearPlanningArrows(mainScreen: pygame.Surface, gameState: engine.GameState)
             for y in range(int(min(from_pos_y, to_pos_y)), int(max(from_pos_y, to_pos_y))+1):
                 arrowCoveredCells.add((x, y))
     for cell in arrowCoveredCells:
-        drawGameCell(mainScreen, gameState, cell)
+        drawGameCell(mainScreen, gameState, viewPos(cell))
 
 
 def clearPlanning(mainScreen: pygame.Surface, gameState: engine.GameState) -> None:
@@ -408,7 +451,7 @@ def clearPlanning(mainScreen: pygame.Surface, gameState: engine.GameState) -> No
     holder.marked_cells_square.clear()
     holder.marked_cells_circle.clear()
     for cell in old_marks:
-        drawGameCell(mainScreen, gameState, cell)
+        drawGameCell(mainScreen, gameState, viewPos(cell))
 
     # clear all previous rendered arrows
     clearPlanningArrows(mainScreen, gameState)
@@ -430,7 +473,10 @@ def setLastMoveCells(gameState: engine.GameState) -> None:
     """
     get the last move starting and target cell.
     """
-    holder.last_move = gameState.translateActionRepr(gameState.action_log.get(-1))
+    if not gameState.action_log:
+        holder.last_move = [(-1, -1), (-1, -1)]
+        return
+    holder.last_move = list(gameState.getLastMove())
 
 
 def drawPieceOptionsGen(mainScreen: pygame.Surface, pos: tuple, promoteOptions: list):
@@ -469,26 +515,30 @@ def drawPieceOptionsGen(mainScreen: pygame.Surface, pos: tuple, promoteOptions:
 
 def choosePieceOption(mainScreen: pygame.Surface, gameState: engine.GameState, pos: tuple, crazyPlace: bool = False) -> bool:
     """
-    Takes over the main Loop, until the player has decided which piece to place.
+    Takes over the main Loop, until the player has decided which piece to place on the board position 'pos'.
     Returns a boolean in case the game is being quit, or the function is being aborted.
     The return value depends on the context!
     """
     currentPlayer = gameState.currentPlayer()
     if crazyPlace:
+        # the cell must be free and, in default mode, the placement must not leave the king in check
+        if not gameState.getDropMap()[pos[1], pos[0]]:
+            return PLACEPIECE_ABORTED
         availablePieces = gameState.getCrazyPlaceOptionsPieces()
         promoteOptions = list(set([piece._name for piece in availablePieces]))
         promoteOptions.sort()
         if len(promoteOptions) == 0:
             return PLACEPIECE_ABORTED
     else:
-        promoteOptions = [PieceChar.BISHOP, PieceChar.KNIGHT,
-                            PieceChar.QUEEN,  PieceChar.ROOK]
+        promoteOptions = promotionOptions
     
     pygame.display.set_mode(BOARD_SIZE, pygame.DOUBLEBUF) # disable resizing momentarily
     
-    offsetPos = pos
-    if (pos[1] + len(promoteOptions)) > config.DIMENSION[0]:
-        offsetPos = (pos[0], pos[1] - ((pos[1] + len(promoteOptions)) - config.DIMENSION[0]))
+    # the options are listed downwards from the cell of 'pos'
+    cell = viewPos(pos)
+    offsetPos = cell
+    if (cell[1] + len(promoteOptions)) > config.DIMENSION[0]:
+        offsetPos = (cell[0], cell[1] - ((cell[1] + len(promoteOptions)) - config.DIMENSION[0]))
     
     promoteOptionsDimensions = []
     for i, pieceChar in enumerate(promoteOptions):
@@ -508,12 +558,6 @@ def choosePieceOption(mainScreen: pygame.Surface, gameState: engine.GameState, p
                 if (col == offsetPos[0]) and (offsetPos[1] <= row < offsetPos[1] + len(promoteOptions)):
                     gameState.placePiece(pos, promoteOptions[row-offsetPos[1]])
                     piecePlaced = PLACEPIECE_PLACED
-                    if crazyPlace:
-                        for piece in availablePieces:
-                            if piece._name == promoteOptions[row-offsetPos[1]]:
-                                availablePieces.remove(piece)
-                                gameState.setCrazyPlaceOptionsPieces(availablePieces)
-                                break
                 elif crazyPlace: # if clicked somewhere else and we are not promoting -> abort
                     piecePlaced = PLACEPIECE_ABORTED
     pygame.display.set_mode(BOARD_SIZE, pygame.DOUBLEBUF | pygame.RESIZABLE) # reset resizablity
@@ -527,11 +571,11 @@ def choosePieceOption(mainScreen: pygame.Surface, gameState: engine.GameState, p
     # the turn is thereby finished and the screen will re-render anyway
     else:
         for i in range(len(promoteOptions)): # cleanup
-            drawGameCell(mainScreen, gameState, (offsetPos[0], offsetPos[1] + i))
+            drawGameCell(mainScreen, gameState, viewPos((offsetPos[0], offsetPos[1] + i)))
     return piecePlaced
 
 
-def rescaleWindow(newWidth: int, newHeight: int, gameState: engine.GameState) -> None:
+def rescaleWindow(newWidth: int, newHeight: int) -> None:
     """
     change all global size variables according to the rescaled window attributes.
     """
@@ -565,8 +609,6 @@ def rescaleWindow(newWidth: int, newHeight: int, gameState: engine.GameState) ->
     holder.attack_icon = loadImage("damage", BOARD_OFFSET)
 
     clearPieceImageCache()
-    for piece in gameState.pieces:
-        piece.loadImage(IMG_SIZE)
 
     for arrow in holder.planning_arrows:
         arrow[0][0] = (arrow[0][0] - (CELL_SIZE_OLD[0] // 2)
@@ -582,16 +624,16 @@ def rescaleWindow(newWidth: int, newHeight: int, gameState: engine.GameState) ->
         arrow[0][1] = arrow[0][1] * CELL_SIZE[1] + (CELL_SIZE[1] // 2)
         arrow[1][0] = arrow[1][0] * CELL_SIZE[0] + (CELL_SIZE[0] // 2)
         arrow[1][1] = arrow[1][1] * CELL_SIZE[1] + (CELL_SIZE[1] // 2)
-        
-    gameState.image_size = IMG_SIZE
 
 
-def gameFinished(mainScreen: pygame.Surface, gameState: engine.GameState) -> None:
+
+def gameFinished(mainScreen: pygame.Surface, gameState: engine.GameState, winner: str = None) -> None:
     """
     we display the winning message and temporarily block mousepresses
-    until the game is quit or restarted
+    until the game is quit or restarted.
+    'winner' can be given, if it has already been checked by the worker.
     """
-    holder.winner = gameState.playerWon()
+    holder.winner = gameState.playerWon() if winner is None else winner
     if holder.winner:
         pygame.event.set_blocked([pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP])
         
@@ -613,9 +655,170 @@ def nextTurn(mainScreen: pygame.Surface, gameState: engine.GameState) -> None:
         # switch to the other player and re-render the entire board, because of possible
         # board flips
         gameState.nextTurn()
+        updateView(gameState)
         
         setLastMoveCells(gameState)
         renderGame(mainScreen, gameState)
+    startPrecompute(gameState)
+
+
+def getOptionsKey(gameState: engine.GameState) -> int:
+    """
+    returns the key of the current position in the options cache. The options
+    are positions on the board, which do not depend on the view.
+    """
+    return gameState.getPositionHash()
+
+
+def cacheOptions(gameState: engine.GameState, key: tuple, piece: Piece) -> tuple:
+    """
+    returns the options of a 'piece' in the position 'key' and caches them.
+    """
+    options = holder.options_cache.get((key, piece.getPos()))
+    if options is None:
+        if len(holder.options_cache) >= OPTIONS_CACHE_SIZE:
+            holder.options_cache.clear()
+        options = gameState.getOptions(piece)
+        holder.options_cache[(key, piece.getPos())] = options
+    return options
+
+
+def getCachedOptions(gameState: engine.GameState, piece: Piece) -> tuple:
+    """
+    Returns the movement- and attack options of a selected 'piece' (see GameState.getOptions),
+    which have most likely been precomputed while the gui was idle.
+    """
+    if not piece:
+        return ([], [])
+    options_move, options_attack = cacheOptions(gameState, getOptionsKey(gameState), piece)
+    return (options_move[:], options_attack[:])
+
+
+def precomputeOptionsGen(gameState: engine.GameState):
+    """
+    computes the options of all pieces of the current player, and afterwards the options
+    of the other player after each turn, beginning with the most likely (see getTurnScore).
+    Yields after every step, such that the work can be spread over the idle time
+    of the main loop. Stops as soon as the position has changed.
+    """
+    key = getOptionsKey(gameState)
+    currentPlayer = gameState.currentPlayer()
+    for piece in [piece for piece in gameState.pieces if piece._player == currentPlayer]:
+        cacheOptions(gameState, key, piece)
+        yield
+        if getOptionsKey(gameState) != key:
+            return
+    turns = gameState.getTurns()
+    turns.sort(key=lambda turn: getTurnScore(gameState, turn), reverse=True)
+    yield
+    for turn in turns:
+        if getOptionsKey(gameState) != key:
+            return
+        # every step plays the turn and takes it back, before the gui can see the position
+        if gameState.makeMove(*turn) != Outcome.GAME_FINISHED:
+            replyKey = getOptionsKey(gameState)
+            replyPlayer = gameState.currentPlayer()
+            for piece in gameState.pieces:
+                if piece._player == replyPlayer:
+                    cacheOptions(gameState, replyKey, piece)
+        gameState.unmakeMove()
+        yield
+
+
+def startPrecompute(gameState: engine.GameState) -> None:
+    """
+    (re)start the idle-time precomputation for the current position.
+    """
+    holder.precompute = None if holder.winner else precomputeOptionsGen(gameState)
+
+
+def idle(milliseconds: int) -> None:
+    """
+    wait for 'milliseconds' to relieve the CPU, but use the time to precompute options
+    (see precomputeOptionsGen) as long as there are some left and the worker is not busy.
+    """
+    end = pygame.time.get_ticks() + milliseconds
+    while holder.precompute is not None and not holder.worker.busy() and pygame.time.get_ticks() < end:
+        if next(holder.precompute, StopIteration) is StopIteration:
+            holder.precompute = None
+    pygame.time.delay(max(end - pygame.time.get_ticks(), 0))
+
+
+def actionJob(gameState: engine.GameState, piece: Piece, pos: tuple, options_move: list,
+              options_attack: list, stop) -> tuple:
+    """
+    runs on the worker: take the action of the player and check if it finished the game.
+    """
+    action = gameState.action(piece, pos, options_move, options_attack)
+    return (action, gameState.playerWon() if action == Outcome.GAME_FINISHED else Outcome.NONE)
+
+
+def finishAction(mainScreen: pygame.Surface, gameState: engine.GameState, result: tuple,
+                 piecePos_old: tuple, cells_old: list, pos: tuple) -> bool:
+    """
+    continues the turn once the worker has taken the action of the player.
+    Returns False if the game is being quit.
+    """
+    action, winner = result
+    running = True
+    holder.options_move, holder.options_attack = [], []
+    holder.selectedPiece = None
+
+    # we re-render the old action options and the old piece position
+    for cell in cells_old:
+        drawGameCell(mainScreen, gameState, cell)
+    drawGameCell(mainScreen, gameState, piecePos_old)
+
+    # if the game is finished (draw, stalemate, mate ...)
+    if action == Outcome.GAME_FINISHED:
+        gameFinished(mainScreen, gameState, winner)
+    # if a pawn can be promoted
+    elif action == Outcome.PAWN_PROMOTION:
+        print("Choose Pawn Promotion...")
+        # we let the player choose the promotion
+        piecePlaced = choosePieceOption(mainScreen, gameState, pos)
+        if piecePlaced == PLACEPIECE_PLACED:
+            print("Pawn promoted!")
+            gameFinished(mainScreen, gameState)
+        running = (piecePlaced != PLACEPIECE_QUIT)
+    if running:
+        nextTurn(mainScreen, gameState)
+    return running
+
+
+def computerJob(gameState: engine.GameState, searcher: Searcher, stop) -> str:
+    """
+    runs on the worker: search the best turn of the computer and play it like a player would.
+    Returns the winner, or None if the search has been cancelled.
+    """
+    turn = searcher.search(gameState, stop=stop)
+    print("Computer:", searcher.getInfo())
+    if stop.is_set():
+        return None
+    if turn is None:
+        # only possible if the default rules are not checked (e.g. no piece left to move)
+        return Outcome.STALEMATE
+    from_pos, to_pos, pieceName = turn
+    piece = gameState.getPiece(from_pos)
+    if piece is None:
+        # crazyplace a piece from the pool
+        gameState.placePiece(to_pos, pieceName)
+    else:
+        options_move, options_attack = gameState.getOptions(piece)
+        if gameState.action(piece, to_pos, options_move, options_attack) == Outcome.PAWN_PROMOTION:
+            gameState.placePiece(to_pos, pieceName)
+    return gameState.playerWon()
+
+
+def finishComputerTurn(mainScreen: pygame.Surface, gameState: engine.GameState, winner: str) -> bool:
+    """
+    continues the turn once the worker has played the turn of the computer.
+    """
+    if winner:
+        gameFinished(mainScreen, gameState, winner)
+    if winner is not None:
+        nextTurn(mainScreen, gameState)
+    return True
 
 
 def newGame() -> engine.GameState:
@@ -627,7 +830,11 @@ def newGame() -> engine.GameState:
     holder.last_move = [(-1, -1), (-1, -1)]
     # new game is tarted so we allow mouse presses again
     pygame.event.set_allowed([pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP])
-    return engine.GameState(IMG_SIZE)
+    gameState = engine.GameState()
+    updateView(gameState)
+    holder.options_cache.clear()
+    startPrecompute(gameState)
+    return gameState
 
 
 def mainGUI():
@@ -646,6 +853,10 @@ def mainGUI():
 
     holder.fps = fpsClock.FPS(argparser.MAX_FPS, BOARD_SIZE[0]-30-BOARD_OFFSET[0], 0)
     holder.attack_icon = loadImage("damage", BOARD_OFFSET)
+    if argparser.AI_PLAYER:
+        holder.computer = (argparser.AI_PLAYER == 'white')
+        holder.searcher = Searcher(argparser.AI_DEPTH, argparser.AI_TIME or None)
+    holder.worker = EngineWorker()
     
     gameState = newGame()
     # if argparser.STARTING_POSITION:
@@ -660,36 +871,53 @@ def mainGUI():
     isPlanning = False
     mouseHover_old = (-1, -1)
     mouseUnfocused = not pygame.mouse.get_focused()
+    # the window changed while the worker was busy, and has to be rendered afterwards
+    renderPending = False
 
     # first time rendering of the whole board
     renderGame(mainScreen, gameState)
 
     running = True
     while running:
-        pygame.display.set_caption('Chess to the Death ' + holder.fps.getFps())
+        caption = 'Chess to the Death ' + holder.fps.getFps()
+        if holder.worker.busy():
+            caption += ' - thinking' + '.' * (pygame.time.get_ticks() // 500 % 4)
+        pygame.display.set_caption(caption)
+
+        if gameState.player_turn == holder.computer and not holder.winner and not holder.worker.busy():
+            holder.worker.start(computerJob, (gameState, holder.searcher), finishComputerTurn)
 
         # highlight cell at mouse position and re-render
         # cell at previous mouse position
-        if holder.highlight_cells and not holder.winner:
+        if holder.highlight_cells and not holder.winner and not holder.worker.busy():
             mouseHover = getMouseCell()
             if mouseHover != mouseHover_old and not isPlanning:
-                drawGameCell(mainScreen, gameState, mouseHover)
-                drawGameCell(mainScreen, gameState, mouseHover_old)
+                drawGameCell(mainScreen, gameState, viewPos(mouseHover))
+                drawGameCell(mainScreen, gameState, viewPos(mouseHover_old))
             elif mouseUnfocused == pygame.mouse.get_focused():
                 if not mouseUnfocused:
                     holder.highlight_cells = False
-                drawGameCell(mainScreen, gameState, mouseHover_old)
+                drawGameCell(mainScreen, gameState, viewPos(mouseHover_old))
                 if not mouseUnfocused:
                     holder.highlight_cells = argparser.HIGHLIGHT_CELLS
                 mouseUnfocused = not mouseUnfocused
             mouseHover_old = mouseHover
-        pygame.time.delay(25)  # relieve the CPU a bit ...
+        idle(25)  # relieve the CPU a bit ...
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                holder.worker.cancel()
                 running = False
                 print("Log:")
                 print(gameState.action_log)
                 break
+            elif event.type == ENGINE_DONE:
+                running = holder.worker.finish(event, mainScreen, gameState) is not False
+                if renderPending and not holder.worker.busy():
+                    renderPending = False
+                    renderGame(mainScreen, gameState)
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and holder.worker.busy():
+                # the gameState belongs to the worker until it is done
+                continue
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouseHover = getMouseCell()
                 # primary mouse button (left) or middle mouse button
@@ -701,14 +929,16 @@ def mainGUI():
                 elif event.button == 3:
                     # planning begins
                     holder.highlight_cells = False
-                    drawGameCell(mainScreen, gameState, mouseHover_old)
+                    drawGameCell(mainScreen, gameState, viewPos(mouseHover_old))
                     isPlanning = True
                     marked_old = mouseHover
             elif event.type == pygame.MOUSEBUTTONUP:
+                # the position on the board of the clicked cell
+                mousePos = viewPos(mouseHover)
                 if event.button == 1:
                      # see if there is a piece at the clicked position
-                    piece = gameState.getPiece(mouseHover)
-                    print("Selected:", piece, mouseHover)
+                    piece = gameState.getPiece(mousePos)
+                    print("Selected:", piece, mousePos)
                     # if it is a valid piece of the current team, we can select it
                     if piece and gameState.selectablePiece(piece):
                         # if it was previously selected we deselect it
@@ -717,7 +947,7 @@ def mainGUI():
                         options_move_old, options_attack_old = holder.options_move, holder.options_attack
                         piece_old = holder.selectedPiece
                         holder.selectedPiece = piece
-                        holder.options_move, holder.options_attack = gameState.getOptions(piece)
+                        holder.options_move, holder.options_attack = getCachedOptions(gameState, piece)
                         # render all optional actions and re-render all option actions from the previous selection
                         for cell in options_move_old + options_attack_old + holder.options_move + holder.options_attack:
                             drawGameCell(mainScreen, gameState, cell)
@@ -726,45 +956,23 @@ def mainGUI():
                         if piece_old:  # re-render old position
                             drawGameCell(mainScreen, gameState, piece_old.getPos())
                     # if there already is a piece selected and now we clicked an enemy piece or an empty cell
-                    elif holder.selectedPiece:
-                        # backup old piece and action options, for later re-rendering
-                        piece_old = holder.selectedPiece
-                        options_move_old, options_attack_old = holder.options_move, holder.options_attack
-                        piecePos_old = piece_old.getPos()
-
-                        # take the action, this will return the type of action taken or if the game is finished or
-                        # if a pawn can be promoted
-                        action = gameState.action(holder.selectedPiece, mouseHover, holder.options_move, holder.options_attack)
-                        if action:
-                            holder.options_move, holder.options_attack = [], []
-                            holder.selectedPiece = None
-
-                            # we re-render the old action options and the old piece position
-                            for cell in options_move_old + options_attack_old:
-                                drawGameCell(mainScreen, gameState, cell)
-                            drawGameCell(mainScreen, gameState, piecePos_old)
-
-                            # if the game is finished (draw, stalemate, mate ...)
-                            if action == Outcome.GAME_FINISHED:
-                                gameFinished(mainScreen, gameState)
-                            # if a pawn can be promoted
-                            elif action == Outcome.PAWN_PROMOTION:
-                                print("Choose Pawn Promotion...")
-                                # we let the player choose the promotion
-                                piecePlaced = choosePieceOption(mainScreen, gameState, mouseHover)
-                                if piecePlaced == PLACEPIECE_PLACED:
-                                    print("Pawn promoted!")
-                                    gameFinished(mainScreen, gameState)
-                                running = (piecePlaced != PLACEPIECE_QUIT)
-                            if running:
-                                nextTurn(mainScreen, gameState)
+                    elif holder.selectedPiece and mousePos in holder.options_move + holder.options_attack:
+                        # backup old piece position and action options, for later re-rendering
+                        cells_old = holder.options_move + holder.options_attack
+                        piecePos_old = holder.selectedPiece.getPos()
+
+                        # take the action on the worker, it will return the type of action taken or if the game
+                        # is finished or if a pawn can be promoted (see finishAction)
+                        holder.worker.start(actionJob, (gameState, holder.selectedPiece, mousePos,
+                                                        holder.options_move, holder.options_attack),
+                                            partial(finishAction, piecePos_old=piecePos_old,
+                                                    cells_old=cells_old, pos=mousePos))
                 elif event.button == 2 and argparser.CRAZY_MODE:
-                    if gameState.restrictedCrazyPlace(mouseHover):
-                        piecePlaced = choosePieceOption(mainScreen, gameState, mouseHover, True)
-                        if piecePlaced == PLACEPIECE_PLACED:
-                            gameFinished(mainScreen, gameState)
-                            nextTurn(mainScreen, gameState)
-                        running = (piecePlaced != PLACEPIECE_QUIT)
+                    piecePlaced = choosePieceOption(mainScreen, gameState, mousePos, True)
+                    if piecePlaced == PLACEPIECE_PLACED:
+                        gameFinished(mainScreen, gameState)
+                        nextTurn(mainScreen, gameState)
+                    running = (piecePlaced != PLACEPIECE_QUIT)
                 elif event.button == 3:
                     mouseHover = getMouseCell()
                     mouseHover = (min(mouseHover[0], config.DIMENSION[1]-1),
@@ -780,7 +988,7 @@ def mainGUI():
                             holder.marked_cells_square.remove(mouseHover)
                         else:
                             holder.marked_cells_circle.add(mouseHover)
-                        drawGameCell(mainScreen, gameState, mouseHover)
+                        drawGameCell(mainScreen, gameState, viewPos(mouseHover))
                         clearPlanningArrows(mainScreen, gameState)
                         drawPlanningArrows(mainScreen)
                     else:
@@ -793,8 +1001,26 @@ def mainGUI():
                         arrow_thickness = 2 * min(IMAGE_OFFSET)
                         drawArrow(mainScreen, newArrow[0], newArrow[1], COLORS[8],
                                   arrow_thickness, 2 * arrow_thickness, arrow_thickness)
-            elif event.type == pygame.KEYDOWN and holder.winner:
-                if pygame.key.name(event.key) == 'r':
+            elif event.type == pygame.KEYDOWN:
+                if pygame.key.name(event.key) == 'u':
+                    # take back the last turn if 'u' is pressed,
+                    # and the turn of the computer before it
+                    holder.worker.cancel()
+                    renderPending = False
+                    undone = gameState.unmakeMove()
+                    while undone and gameState.player_turn == holder.computer and gameState.unmakeMove():
+                        pass
+                    if undone:
+                        print("Undo:")
+                        print(gameState)
+                        holder.selectedPiece, holder.winner = None, None
+                        holder.options_move, holder.options_attack = [], []
+                        pygame.event.set_allowed([pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP])
+                        updateView(gameState)
+                        setLastMoveCells(gameState)
+                        renderGame(mainScreen, gameState)
+                        startPrecompute(gameState)
+                elif pygame.key.name(event.key) == 'r' and holder.winner:
                     # restart the game if 'r' is pressed,
                     # new gameengine and refresh of entire board
                     print("Log:")
@@ -805,12 +1031,16 @@ def mainGUI():
             elif event.type == pygame.VIDEORESIZE:
                 # if the window has been rescaled/resized we need to update all global variables
                 # according to the new size
-                rescaleWindow(event.w, event.h, gameState)
+                rescaleWindow(event.w, event.h)
                 mainScreen = pygame.display.set_mode(BOARD_SIZE, pygame.DOUBLEBUF | pygame.RESIZABLE)
-                # then we render everything again
-                renderGame(mainScreen, gameState)
+                # then we render everything again, once the worker is done
+                renderPending = holder.worker.busy()
+                if not renderPending:
+                    renderGame(mainScreen, gameState)
             elif event.type == pygame.WINDOWRESTORED:  # handles window minimising/maximising
-                renderGame(mainScreen, gameState)
+                renderPending = holder.worker.busy()
+                if not renderPending:
+                    renderGame(mainScreen, gameState)
     pygame.quit()
-    print("Current Board Position:", config.generateFENFromBoard(gameState.board, gameState.player_turn), sep="\n")
+    print("Current Board Position:", gameState.getFEN(), sep="\n")
     print("GoodBye!")
@@ -0,0 +1,128 @@
+import numpy as np
+
+from chess_to_the_death.util.bitboard import ROOK_DIRECTIONS, BISHOP_DIRECTIONS, KNIGHT_OFFSETS, KING_OFFSETS, \
+    PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+
+# The kernels work on a single board (height, width) as well as on a stack of
+# boards (..., height, width), e.g. every board of an ActionLog (see ActionLog.getBoards).
+# The pieces of a player are identified by the sign of their id on the board (see GameState.getPieceID).
+
+# the pawn attacks of a player walking upwards (the walking direction is flipped for downwards)
+PAWN_ATTACK_OFFSETS = [(-1, -1), (1, -1)]
+
+
+def shift(masks: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """
+    returns the 'masks' moved by 'dx' columns and 'dy' rows over the last two axes.
+    Cells moved off the board are dropped, the uncovered cells are zero.
+    """
+    height, width = masks.shape[-2:]
+    shifted = np.zeros_like(masks)
+    if abs(dx) >= width or abs(dy) >= height:
+        return shifted
+    shifted[..., max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] = \
+        masks[..., max(-dy, 0):height + min(-dy, 0), max(-dx, 0):width + min(-dx, 0)]
+    return shifted
+
+
+def getPlayerMask(boards: np.ndarray, white: bool) -> np.ndarray:
+    """
+    returns the cells occupied by the pieces of a player.
+    """
+    return (boards > 0) if white else (boards < 0)
+
+
+def getCountsDtype(pieces: np.ndarray) -> np.dtype:
+    return np.result_type(pieces.dtype, np.int16)
+
+
+def leaperCounts(pieces: np.ndarray, offsets: list) -> np.ndarray:
+    """
+    returns how many of the 'pieces' (a boolean mask) reach each cell
+    with one of the 'offsets' (dx, dy). If 'pieces' holds a weight per cell
+    instead, the weights of the pieces reaching a cell are summed.
+    """
+    counts = np.zeros(pieces.shape, dtype=getCountsDtype(pieces))
+    for dx, dy in offsets:
+        counts += shift(pieces, dx, dy)
+    return counts
+
+
+def sliderCounts(pieces: np.ndarray, empty: np.ndarray, directions: list) -> np.ndarray:
+    """
+    returns how many of the 'pieces' (a boolean mask) reach each cell sliding along one
+    of the 'directions' (dx, dy). A ray goes on over the 'empty' cells and stops at the first
+    occupied cell, which is reached as well. Weights are summed like in leaperCounts.
+    """
+    counts = np.zeros(pieces.shape, dtype=getCountsDtype(pieces))
+    steps = max(pieces.shape[-2:])
+    for dx, dy in directions:
+        ray = shift(pieces, dx, dy)
+        for _ in range(steps):
+            if not ray.any():
+                break
+            counts += ray
+            ray = shift(ray * empty, dx, dy)
+    return counts
+
+
+def getPawnAttackOffsets(flip: bool) -> list:
+    """
+    returns the pawn attack offsets, if 'flip' the pawns walk downwards.
+    """
+    return [(-dx, -dy) for dx, dy in PAWN_ATTACK_OFFSETS] if flip else PAWN_ATTACK_OFFSETS
+
+
+def attackCounts(boards: np.ndarray, white: bool, flip: bool = None, weights: np.ndarray = None) -> np.ndarray:
+    """
+    returns how many pieces of a player attack each cell, no matter which piece
+    stands on that cell. 'flip' is the walking direction of the pawns (see GameState.pawnFlip),
+    by default the pawns of white walk upwards and the pawns of black downwards.
+    If 'weights' (e.g. the damage of every piece) is given, the weights of the attacking
+    pieces are summed instead.
+    """
+    if flip is None:
+        flip = not white
+    boards = np.asarray(boards)
+    pieces = np.abs(boards) * getPlayerMask(boards, white)
+    empty = boards == 0
+    if weights is None:
+        weights = True
+    queens = pieces == QUEEN
+    counts = leaperCounts((pieces == PAWN) * weights, getPawnAttackOffsets(flip))
+    counts += leaperCounts((pieces == KNIGHT) * weights, KNIGHT_OFFSETS)
+    counts += leaperCounts((pieces == KING) * weights, KING_OFFSETS)
+    counts += sliderCounts(((pieces == ROOK) | queens) * weights, empty, ROOK_DIRECTIONS)
+    counts += sliderCounts(((pieces == BISHOP) | queens) * weights, empty, BISHOP_DIRECTIONS)
+    return counts
+
+
+def attackMaps(boards: np.ndarray, white: bool, flip: bool = None) -> np.ndarray:
+    """
+    returns a boolean mask of the cells attacked by a player (see attackCounts).
+    """
+    return attackCounts(boards, white, flip) > 0
+
+
+def mobility(boards: np.ndarray, white: bool, flip: bool = None) -> np.ndarray:
+    """
+    returns the number of moves and attacks of a player on each board (the shape of 'boards'
+    without the last two axes), as the sum of all Piece.getOptions would count them.
+    The board does not tell which pieces have moved already, therefor the double step
+    of the pawns and castling are not counted.
+    """
+    if flip is None:
+        flip = not white
+    boards = np.asarray(boards)
+    own = getPlayerMask(boards, white)
+    enemies = getPlayerMask(boards, not white)
+    empty = boards == 0
+    pieces = np.abs(boards) * own
+    pawns = pieces == PAWN
+    # pawns only attack enemies and move forward instead
+    pawnAttacks = leaperCounts(pawns, getPawnAttackOffsets(flip))
+    options = ((attackCounts(boards, white, flip) - pawnAttacks) * ~own).sum(axis=(-2, -1))
+    options += (pawnAttacks * enemies).sum(axis=(-2, -1))
+    options += (shift(pawns, 0, 1 if flip else -1) & empty).sum(axis=(-2, -1))
+    return options
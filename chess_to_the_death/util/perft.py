@@ -0,0 +1,138 @@
+from sys import exit as sysexit
+from time import perf_counter
+
+import chess_to_the_death.util.config as config
+import chess_to_the_death.parser.argparser as argparser
+from chess_to_the_death.util.engine import GameState
+from chess_to_the_death.util.definition import Outcome, PieceChar
+
+
+START_POSITION = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w"
+
+# the number of turn sequences of length 1, 2, ... from a position, with
+# the rule set (DEFAULT_MODE, CRAZY_MODE) and the default health/damage values.
+# Pawns keep their double step and kings their castling as long as they have not
+# moved in this game, therefor only the starting position matches the counts of regular chess.
+PERFT_REFERENCES = {
+    (START_POSITION, True, False): [20, 400, 8902, 197281],
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w", True, False): [48, 2078, 99667],
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w", True, False): [14, 207, 3136, 52220],
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w", True, False): [6, 264, 9863],
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w", True, False): [43, 1459, 60311],
+    ("5Q/3k2/1p4/1Pp2p/2Pp1P/3P1K b", True, False): [2, 22, 62, 639],
+    ("rnbqkbnr/pppppppp/10/10/PPPPPPPPPP/RNBQKBNRRR w", True, False): [24, 539, 13878],
+    (START_POSITION, False, False): [20, 400, 8902, 197743],
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w", False, False): [48, 2091, 100415],
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w", False, False): [17, 331, 6068, 122988],
+    (START_POSITION, True, True): [20, 400, 8902, 197281],
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w", True, True): [48, 2078, 111015],
+    (START_POSITION, False, True): [20, 400, 8902, 197743],
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w", False, True): [48, 2091, 104749],
+}
+
+
+def perft(gameState: GameState, depth: int) -> int:
+    """
+    count all sequences of 'depth' turns the gameState can play.
+    A finished game ends the sequence, so it is only counted on the last turn.
+    """
+    turns = gameState.getTurns()
+    if depth <= 1:
+        return len(turns) if depth == 1 else 1
+    nodes = 0
+    for turn in turns:
+        if gameState.makeMove(*turn) != Outcome.GAME_FINISHED:
+            nodes += perft(gameState, depth-1)
+        gameState.unmakeMove()
+    return nodes
+
+
+def divide(gameState: GameState, depth: int) -> dict:
+    """
+    returns a dictionary with the perft count of 'depth' for each
+    first turn, identified like the actions in the ActionLog (e.g. 'E2-E4').
+    """
+    counts = {}
+    for turn in gameState.getTurns():
+        from_pos, to_pos, pieceName = turn
+        turnRepr = gameState.alpha_identifiers[from_pos[0]] + gameState.numbers_identifiers[from_pos[1]] + '-' + \
+            gameState.alpha_identifiers[to_pos[0]] + gameState.numbers_identifiers[to_pos[1]]
+        if pieceName != PieceChar.UNDEFINED:
+            turnRepr += pieceName
+        if gameState.makeMove(*turn) == Outcome.GAME_FINISHED:
+            counts[turnRepr] = int(depth == 1)
+        else:
+            counts[turnRepr] = perft(gameState, depth-1)
+        gameState.unmakeMove()
+    return counts
+
+
+def getReference(fen: str) -> list:
+    """
+    returns the stored reference counts of the position 'fen' for the
+    current rule set, or an empty list if there are none.
+    """
+    if argparser.RANDOM_VALUES:
+        return []
+    fen = ' '.join(fen.split(' ')[:2])
+    return PERFT_REFERENCES.get((fen, argparser.DEFAULT_MODE, argparser.CRAZY_MODE), [])
+
+
+def runPerft(fen: str, depth: int, showDivide: bool = False) -> bool:
+    """
+    run perft on the position 'fen' with every depth up to 'depth' and print the
+    node count and speed. The counts are compared to the stored reference counts.
+    Returns False if any count differs from its reference.
+    """
+    fen = fen or START_POSITION
+    config.generateBoardFromFEN(fen, argparser.CRAZY_MODE)
+    gameState = GameState(displayInfo=False)
+    reference = getReference(fen)
+    matches = True
+    print(fen, '|', 'default' if argparser.DEFAULT_MODE else 'to the death', '+ crazy' * argparser.CRAZY_MODE)
+    for d in range(1, depth+1):
+        start = perf_counter()
+        if showDivide and d == depth:
+            counts = divide(gameState, d)
+            for turnRepr, nodes in counts.items():
+                print(turnRepr + ':', nodes)
+            nodes = sum(counts.values())
+        else:
+            nodes = perft(gameState, d)
+        duration = perf_counter() - start
+        result = ''
+        if d <= len(reference):
+            if nodes == reference[d-1]:
+                result = '\x1b[32mOK\x1b[0m'
+            else:
+                result = '\x1b[31mexpected ' + str(reference[d-1]) + '\x1b[0m'
+                matches = False
+        print(f"perft({d}) = {nodes:>10} {duration:8.3f}s {nodes / max(duration, 1e-9):10.0f} nodes/s", result)
+    return matches
+
+
+def runPerftSuite(depth: int) -> bool:
+    """
+    run perft on every position with stored reference counts, up to 'depth'
+    (or the number of stored counts). The rule set is set for each position and reset afterwards.
+    Returns False if any count differs from its reference.
+    """
+    modes = (argparser.DEFAULT_MODE, argparser.CRAZY_MODE)
+    matches = True
+    for (fen, default, crazy), reference in PERFT_REFERENCES.items():
+        argparser.DEFAULT_MODE, argparser.CRAZY_MODE = default, crazy
+        matches &= runPerft(fen, min(depth, len(reference)))
+    argparser.DEFAULT_MODE, argparser.CRAZY_MODE = modes
+    return matches
+
+
+def mainPerft() -> None:
+    """
+    run perft as requested by the command line arguments and
+    exit with an error code if any count differs from its reference.
+    """
+    if argparser.PERFT_SUITE:
+        matches = runPerftSuite(argparser.PERFT_DEPTH or 4)
+    else:
+        matches = runPerft(argparser.STARTING_POSITION, argparser.PERFT_DEPTH, argparser.PERFT_DIVIDE)
+    sysexit(0 if matches else 1)
@@ -0,0 +1,109 @@
+import numpy as np
+from itertools import chain
+
+import chess_to_the_death.util.config as config
+from chess_to_the_death.entity.pieces import PIECE_TYPES
+from chess_to_the_death.entity.player import Player
+from chess_to_the_death.util.definition import pieceTranslateDic
+
+
+class PieceStore:
+    # the arrays of a store, in the order they are serialized (see tobytes)
+    FIELDS = ('ids', 'cols', 'rows', 'health', 'maxHealth', 'damage', 'firstMove')
+    DTYPES = (config.boardDtype, np.int16, np.int16, np.int32, np.int32, np.int32, np.bool_)
+
+    def __init__(self, size: int = 0):
+        """
+        a set of pieces as parallel arrays, one entry per piece. The id is the
+        piece type, negative for black pieces (see GameState.getPieceID).
+        Copying, comparing and serializing a store only copies its arrays.
+        """
+        for field, dtype in zip(self.FIELDS, self.DTYPES):
+            setattr(self, field, np.zeros(size, dtype=dtype))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PieceStore) and \
+            all(np.array_equal(getattr(self, field), getattr(other, field)) for field in self.FIELDS)
+
+    @classmethod
+    def fromPieces(cls, pieces: list) -> 'PieceStore':
+        """
+        returns a store holding the values of the 'pieces'.
+        """
+        store = cls()
+        values = [(pieceTranslateDic[piece._name] * (1 if piece._player == Player.PLAYER_W else -1),
+                   piece.cell_col, piece.cell_row, piece.health, piece.maxHealth, piece.damage, piece.firstMove)
+                  for piece in pieces]
+        # converting all values at once is a lot faster than filling single array elements
+        table = np.fromiter(chain.from_iterable(values), dtype=np.int32,
+                            count=len(values) * len(cls.FIELDS)).reshape(len(values), len(cls.FIELDS))
+        for i, (field, dtype) in enumerate(zip(cls.FIELDS, cls.DTYPES)):
+            setattr(store, field, table[:, i].astype(dtype))
+        return store
+
+    def toPieces(self) -> list:
+        """
+        returns new Piece objects in the order of the store.
+        """
+        pieces = []
+        for pieceID, col, row, health, maxHealth, damage, firstMove in \
+                zip(*(getattr(self, field).tolist() for field in self.FIELDS)):
+            piece = PIECE_TYPES[pieceTranslateDic[abs(pieceID)]]((col, row),
+                                                                   Player.PLAYER_W if pieceID > 0 else Player.PLAYER_B)
+            piece.health, piece.maxHealth, piece.damage = health, maxHealth, damage
+            piece.firstMove = firstMove
+            pieces.append(piece)
+        return pieces
+
+    def freeze(self) -> 'PieceStore':
+        """
+        make the arrays of the store read-only and return the store.
+        """
+        for field in self.FIELDS:
+            getattr(self, field).flags.writeable = False
+        return self
+
+    def copy(self) -> 'PieceStore':
+        store = PieceStore()
+        for field in self.FIELDS:
+            setattr(store, field, getattr(self, field).copy())
+        return store
+
+    def tobytes(self) -> bytes:
+        """
+        returns the store serialized, e.g. to hash or to save it (see frombytes).
+        """
+        return b''.join(getattr(self, field).tobytes() for field in self.FIELDS)
+
+    @classmethod
+    def frombytes(cls, data: bytes) -> 'PieceStore':
+        """
+        returns the store serialized with tobytes.
+        """
+        size = len(data) // sum(np.dtype(dtype).itemsize for dtype in cls.DTYPES)
+        store, offset = cls(), 0
+        for field, dtype in zip(cls.FIELDS, cls.DTYPES):
+            setattr(store, field, np.frombuffer(data, dtype=dtype, count=size, offset=offset).copy())
+            offset += size * np.dtype(dtype).itemsize
+        return store
+
+    def getBoard(self) -> np.ndarray:
+        """
+        returns the board of the pieces (see GameState.buildBoard).
+        """
+        board = np.zeros(config.DIMENSION, dtype=config.boardDtype)
+        board[self.rows, self.cols] = self.ids
+        return board
+
+    def getArray(self, field: str) -> np.ndarray:
+        """
+        returns the values of a 'field' (e.g. 'health') in the shape of the board,
+        zero on the empty cells.
+        """
+        values = getattr(self, field)
+        array = np.zeros(config.DIMENSION, dtype=values.dtype)
+        array[self.rows, self.cols] = values
+        return array
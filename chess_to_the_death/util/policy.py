@@ -0,0 +1,41 @@
+from random import Random
+
+import chess_to_the_death.parser.argparser as argparser
+from chess_to_the_death.util.engine import GameState
+from chess_to_the_death.util.search import Searcher, getTurnScore
+
+
+# one searcher per process, its transposition table is kept between the turns
+_searcher = None
+
+
+def randomPolicy(gameState: GameState, rng: Random) -> tuple:
+    """
+    choose any of the possible turns.
+    """
+    return rng.choice(gameState.getTurns())
+
+
+def greedyPolicy(gameState: GameState, rng: Random) -> tuple:
+    """
+    choose the turn that deals the most damage, weighted by the value of the attacked piece.
+    """
+    turns = gameState.getTurns()
+    rng.shuffle(turns)
+    return max(turns, key=lambda turn: getTurnScore(gameState, turn))
+
+
+def searchPolicy(gameState: GameState, rng: Random) -> tuple:
+    """
+    choose the turn the alpha-beta search (see util/search.py) considers best,
+    within the depth and time given by the command line arguments.
+    """
+    global _searcher
+    if _searcher is None:
+        _searcher = Searcher(argparser.AI_DEPTH, argparser.AI_TIME or None)
+    return _searcher.search(gameState, rng)
+
+
+POLICIES = {'random': randomPolicy,
+            'greedy': greedyPolicy,
+            'search': searchPolicy}
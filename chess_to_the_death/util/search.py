@@ -0,0 +1,240 @@
+from random import Random
+from threading import Event
+from time import perf_counter
+
+from chess_to_the_death.util.engine import GameState
+from chess_to_the_death.util.definition import Outcome, PieceChar, PieceValues
+
+
+WIN_SCORE = 100000
+# the number of attacks the quiescence search looks at after the last full turn
+QUIESCENCE_DEPTH = 4
+# the transposition table is cleared, once it holds this many positions
+TABLE_SIZE = 1 << 20
+# how often (in nodes) the search checks, whether its time is up
+TIME_CHECK_INTERVAL = 256
+
+EXACT, LOWER_BOUND, UPPER_BOUND = range(3)
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def evaluate(gameState: GameState) -> float:
+    """
+    returns the piece values of the current player minus the piece values
+    of the other player. Each value is weighted by the health left, because
+    an attack only takes a piece once its health reaches zero.
+    """
+    score = 0
+    currentPlayer = gameState.currentPlayer()
+    for piece in gameState.pieces:
+        value = PieceValues.VALUES[piece._name] * piece.health / piece.maxHealth
+        score += value if piece._player == currentPlayer else -value
+    return score
+
+
+def getTurnScore(gameState: GameState, turn: tuple) -> float:
+    """
+    returns the piece value a 'turn' takes from the enemy, proportional
+    to the damage dealt, plus the value gained by a promotion.
+    A turn that takes the attacked piece is worth its whole value on top.
+    """
+    from_pos, to_pos, pieceName = turn
+    piece = gameState.getPiece(from_pos)
+    if piece is None:
+        return 0
+    score = 0
+    target = gameState.getPiece(to_pos)
+    if target is not None and target._player != piece._player:
+        damage = min(target.health, piece.damage)
+        score += PieceValues.VALUES[target._name] * damage / target.maxHealth
+        if damage >= target.health:
+            score += PieceValues.VALUES[target._name]
+    if pieceName != PieceChar.UNDEFINED and from_pos != to_pos:
+        score += PieceValues.VALUES[pieceName] - PieceValues.VALUES[PieceChar.PAWN]
+    return score
+
+
+def isAttack(gameState: GameState, turn: tuple) -> bool:
+    """
+    checks whether a 'turn' attacks an enemy piece.
+    """
+    piece, target = gameState.getPiece(turn[0]), gameState.getPiece(turn[1])
+    return piece is not None and target is not None and target._player != piece._player
+
+
+class Searcher:
+    def __init__(self, maxDepth: int, timeLimit: float = None):
+        """
+        an iterative deepening alpha-beta search up to 'maxDepth' turns,
+        which stops after 'timeLimit' seconds (if given). The transposition table
+        is kept between the searches of the same game.
+        """
+        self.maxDepth = maxDepth
+        self.timeLimit = timeLimit
+        self.table = {}
+        self.gameState = None
+        self.rootTurns = []
+        self.deadline = None
+        self.stop = None
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self.duration = 0
+
+    def getKey(self, gameState: GameState):
+        """
+        returns the transposition table key of the current position. The position hash
+        covers the health of all pieces, unless the default variant is played.
+        """
+        positionHash = gameState.getPositionHash()
+        if gameState.crazy:
+            return (positionHash,
+                    tuple(sorted(piece._name for piece in gameState.white_crazyoptions)),
+                    tuple(sorted(piece._name for piece in gameState.black_crazyoptions)))
+        return positionHash
+
+    def orderTurns(self, gameState: GameState, turns: list, bestTurn: tuple = None) -> list:
+        """
+        sort the 'turns' such that the best turn of a previous search comes first,
+        followed by the turns dealing the most valuable damage.
+        """
+        turns = sorted(turns, key=lambda turn: getTurnScore(gameState, turn), reverse=True)
+        if bestTurn in turns:
+            turns.remove(bestTurn)
+            turns.insert(0, bestTurn)
+        return turns
+
+    def checkTime(self) -> None:
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL:
+            return
+        if (self.deadline is not None and perf_counter() > self.deadline) or \
+            (self.stop is not None and self.stop.is_set()):
+            raise SearchTimeout()
+
+    def getFinishedScore(self, gameState: GameState, ply: int) -> float:
+        """
+        returns the score of a game the last turn finished. Only the player making
+        the turn is able to win, and a faster win is preferred.
+        """
+        if gameState.outcome in (Outcome.WHITE_WON, Outcome.BLACK_WON):
+            return WIN_SCORE - ply
+        return 0
+
+    def quiescence(self, gameState: GameState, alpha: float, beta: float, depth: int, ply: int) -> float:
+        """
+        extend the search with attacks only, until the position is quiet.
+        """
+        self.checkTime()
+        standPat = evaluate(gameState)
+        if depth <= 0 or standPat >= beta:
+            return standPat
+        alpha = max(alpha, standPat)
+        turns = [turn for turn in gameState.getTurns() if isAttack(gameState, turn)]
+        for turn in self.orderTurns(gameState, turns):
+            if gameState.makeMove(*turn) == Outcome.GAME_FINISHED:
+                score = self.getFinishedScore(gameState, ply)
+                gameState.unmakeMove()
+            else:
+                try:
+                    score = -self.quiescence(gameState, -beta, -alpha, depth-1, ply+1)
+                finally:
+                    gameState.unmakeMove()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def negamax(self, gameState: GameState, depth: int, alpha: float, beta: float, ply: int) -> tuple:
+        """
+        returns the score of the current position for the current player
+        and the best turn, searching 'depth' turns ahead.
+        """
+        if depth <= 0:
+            return (self.quiescence(gameState, alpha, beta, QUIESCENCE_DEPTH, ply), None)
+        self.checkTime()
+        key = self.getKey(gameState)
+        entry = self.table.get(key)
+        bestTurn = None
+        if entry is not None:
+            entryDepth, entryScore, entryFlag, bestTurn = entry
+            if entryDepth >= depth and ply > 0:
+                if entryFlag == EXACT:
+                    return (entryScore, bestTurn)
+                if entryFlag == LOWER_BOUND and entryScore >= beta:
+                    return (entryScore, bestTurn)
+                if entryFlag == UPPER_BOUND and entryScore <= alpha:
+                    return (entryScore, bestTurn)
+        turns = self.rootTurns if ply == 0 else gameState.getTurns()
+        if not turns:
+            return (0, None)
+        alphaStart = alpha
+        bestScore = -WIN_SCORE - 1
+        for turn in self.orderTurns(gameState, turns, bestTurn):
+            if gameState.makeMove(*turn) == Outcome.GAME_FINISHED:
+                score = self.getFinishedScore(gameState, ply)
+                gameState.unmakeMove()
+            else:
+                try:
+                    score = -self.negamax(gameState, depth-1, -beta, -alpha, ply+1)[0]
+                finally:
+                    gameState.unmakeMove()
+            if score > bestScore:
+                bestScore, bestTurn = score, turn
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        if bestScore <= alphaStart:
+            flag = UPPER_BOUND
+        elif bestScore >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        if len(self.table) >= TABLE_SIZE:
+            self.table = {}
+        self.table[key] = (depth, bestScore, flag, bestTurn)
+        return (bestScore, bestTurn)
+
+    def search(self, gameState: GameState, rng: Random = None, stop: Event = None) -> tuple:
+        """
+        returns the best turn (from_pos, to_pos, pieceName) of the current player
+        (see GameState.getTurns). The first depth is always completed, every deeper
+        one only if the time limit allows it. 'rng' breaks ties between equal turns.
+        Setting the 'stop' event ends the search early, even during the first depth.
+        """
+        start = perf_counter()
+        if gameState is not self.gameState:
+            self.gameState, self.table = gameState, {}
+        self.deadline = None
+        self.stop = stop
+        self.nodes = 0
+        self.rootTurns = gameState.getTurns()
+        if rng is not None:
+            rng.shuffle(self.rootTurns)
+        bestTurn = self.rootTurns[0] if self.rootTurns else None
+        for depth in range(1, self.maxDepth+1):
+            try:
+                score, turn = self.negamax(gameState, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+            except SearchTimeout:
+                break
+            if turn is not None:
+                bestTurn = turn
+            self.depth, self.score = depth, score
+            if abs(score) >= WIN_SCORE - self.maxDepth:
+                break
+            if self.timeLimit is not None:
+                self.deadline = start + self.timeLimit
+                if perf_counter() > self.deadline:
+                    break
+        self.duration = perf_counter() - start
+        return bestTurn
+
+    def getInfo(self) -> str:
+        """
+        returns a description of the last search.
+        """
+        return f"depth {self.depth}, score {self.score:.2f}, {self.nodes} nodes, " + \
+            f"{self.nodes / max(self.duration, 1e-9):.0f} nodes/s"
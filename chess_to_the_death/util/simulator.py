@@ -0,0 +1,117 @@
+import json
+import random
+from collections import Counter
+from multiprocessing import Pool
+from time import perf_counter
+
+import chess_to_the_death.util.config as config
+import chess_to_the_death.parser.argparser as argparser
+from chess_to_the_death.util.engine import GameState
+from chess_to_the_death.util.policy import POLICIES
+from chess_to_the_death.util.definition import Outcome
+
+
+# the outcome of games that reached the maximum number of turns
+PLY_LIMIT = 'PLY LIMIT'
+
+
+def getSettings() -> dict:
+    """
+    returns the rule set given by the command line arguments, such that
+    worker processes can apply it again (see applySettings).
+    """
+    return {'DEFAULT_MODE': argparser.DEFAULT_MODE,
+            'CRAZY_MODE': argparser.CRAZY_MODE,
+            'RANDOM_VALUES': argparser.RANDOM_VALUES,
+            'DEBUG_MODE': argparser.DEBUG_MODE,
+            'AI_DEPTH': argparser.AI_DEPTH,
+            'AI_TIME': argparser.AI_TIME,
+            'STARTING_POSITION': argparser.STARTING_POSITION}
+
+
+def applySettings(settings: dict) -> None:
+    """
+    set the argparser values and the starting position of a worker process.
+    Processes that are spawned instead of forked start with the defaults otherwise.
+    """
+    for key, value in settings.items():
+        setattr(argparser, key, value)
+    config.generateBoardFromFEN(argparser.STARTING_POSITION, argparser.CRAZY_MODE)
+
+
+def playGame(game: int, seed: int, white: str, black: str, maxPlies: int, health_damage: dict = None) -> dict:
+    """
+    play a single game between the policies 'white' and 'black'.
+    The 'seed' determines the health and damage values (-random) and every
+    decision of the policies. 'health_damage' replaces the values of all pieces.
+    Returns a dictionary describing the game.
+    """
+    start = perf_counter()
+    random.seed(seed)
+    rng = random.Random(seed)
+    gameState = GameState(displayInfo=False, health_damage=health_damage)
+    policies = {True: POLICIES[white], False: POLICIES[black]}
+    plies, outcome = 0, PLY_LIMIT
+    while plies < maxPlies:
+        turns = gameState.getTurns()
+        if not turns:
+            # only possible if the default rules are not checked (e.g. no piece left to move)
+            outcome = Outcome.STALEMATE
+            break
+        turn = policies[gameState.player_turn](gameState, rng)
+        plies += 1
+        if gameState.makeMove(*turn) == Outcome.GAME_FINISHED:
+            outcome = gameState.outcome
+            break
+    return {'game': game, 'seed': seed, 'white': white, 'black': black,
+            'outcome': outcome, 'plies': plies, 'seconds': round(perf_counter() - start, 4)}
+
+
+def playGameJob(args: tuple) -> dict:
+    """
+    play a game with the arguments of playGame packed into a tuple (for Pool.imap).
+    """
+    return playGame(*args)
+
+
+def simulate(games: int, white: str, black: str, processes: int, seed: int,
+             maxPlies: int, resultsFile: str) -> Counter:
+    """
+    play 'games' games on a pool of 'processes' worker processes. Every result
+    is appended to the 'resultsFile' (one json object per line) as soon as the game is finished.
+    Prints the throughput and returns the number of games per outcome.
+    """
+    jobs = [(game, seed + game, white, black, maxPlies) for game in range(games)]
+    outcomes = Counter()
+    plies = 0
+    start = perf_counter()
+    with open(resultsFile, 'a', encoding='utf-8') as results:
+        if processes <= 1:
+            pool = None
+            resultIter = map(playGameJob, jobs)
+        else:
+            pool = Pool(processes, initializer=applySettings, initargs=(getSettings(),))
+            resultIter = pool.imap_unordered(playGameJob, jobs)
+        try:
+            for result in resultIter:
+                results.write(json.dumps(result) + '\n')
+                results.flush()
+                outcomes[result['outcome']] += 1
+                plies += result['plies']
+        finally:
+            if pool is not None:
+                pool.terminate()
+    duration = perf_counter() - start
+    print(f"{games} games ({white} vs. {black}) in {duration:.2f}s:",
+          f"{games / duration:.2f} games/s, {plies / duration:.1f} plies/s")
+    for outcome, count in outcomes.most_common():
+        print(f"{outcome:>22}: {count}")
+    return outcomes
+
+
+def mainSimulator() -> None:
+    """
+    run the simulation requested by the command line arguments.
+    """
+    simulate(argparser.SIMULATE_GAMES, argparser.WHITE_POLICY, argparser.BLACK_POLICY,
+             argparser.PROCESSES, argparser.SEED, argparser.MAX_PLIES, argparser.RESULTS_FILE)
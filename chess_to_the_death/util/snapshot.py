@@ -0,0 +1,56 @@
+import numpy as np
+
+from chess_to_the_death.util.piecestore import PieceStore
+
+
+class Snapshot:
+    __slots__ = ('board', 'pieces', 'player_turn', 'last_move', 'turn_state', 'position_hash', 'outcome',
+                 'white_pool', 'black_pool', 'value_taken', 'health_damage')
+
+    def __init__(self, board: np.ndarray, pieces: PieceStore, player_turn: bool, last_move: tuple,
+                 turn_state: tuple, position_hash: int, outcome: str, white_pool: tuple, black_pool: tuple,
+                 value_taken: tuple, health_damage: tuple):
+        """
+        a read-only copy of a position (see GameState.getSnapshot). It holds the board,
+        the pieces with their health, damage and castling/double-step rights (firstMove),
+        the player to move, the last move and the en Passant cell and move counters
+        (see GameState.getTurnState). The crazy pools hold the
+        names of the captured white and black pieces.
+        The arrays are read-only, therefor a snapshot can be shared with other threads,
+        or pickled for other processes, while the game goes on.
+        """
+        board.flags.writeable = False
+        self.board = board
+        self.pieces = pieces.freeze()
+        self.player_turn = player_turn
+        self.last_move = last_move
+        self.turn_state = turn_state
+        self.position_hash = position_hash
+        self.outcome = outcome
+        self.white_pool = white_pool
+        self.black_pool = black_pool
+        self.value_taken = value_taken
+        self.health_damage = health_damage
+
+    def __getstate__(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        for field, value in state.items():
+            object.__setattr__(self, field, value)
+        self.board.flags.writeable = False
+        self.pieces.freeze()
+
+    def __setattr__(self, name: str, value) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f"a Snapshot is read-only, '{name}' cannot be changed")
+        object.__setattr__(self, name, value)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Snapshot) and self.position_hash == other.position_hash and \
+            np.array_equal(self.board, other.board) and self.pieces == other.pieces and \
+            (self.player_turn, self.last_move, self.turn_state, self.white_pool, self.black_pool) == \
+            (other.player_turn, other.last_move, other.turn_state, other.white_pool, other.black_pool)
+
+    def __hash__(self) -> int:
+        return hash(self.position_hash)
@@ -0,0 +1,149 @@
+import json
+from math import sqrt
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+
+import chess_to_the_death.parser.argparser as argparser
+from chess_to_the_death.entity.player import Player
+from chess_to_the_death.util.engine import createPiece, printValueStatistic, RANDOM_VALUE_RANGE
+from chess_to_the_death.util.simulator import applySettings, getSettings, playGameJob
+from chess_to_the_death.util.definition import Outcome, PieceChar
+
+
+TUNED_PIECES = [PieceChar.PAWN, PieceChar.KNIGHT, PieceChar.BISHOP,
+                PieceChar.ROOK, PieceChar.QUEEN, PieceChar.KING]
+# a mutation scales a single health- or damage value by a factor within this range
+MUTATION_RANGE = (0.75, 1.33)
+
+
+def getDefaultValues() -> dict:
+    """
+    returns the health- and damage values every piece type starts with.
+    """
+    values = {}
+    for pieceChar in TUNED_PIECES:
+        piece = createPiece(pieceChar, (0, 0), Player.PLAYER_W)
+        values[pieceChar] = (piece.health, piece.damage)
+    return values
+
+
+def wilsonInterval(successes: int, trials: int, z: float = 1.96) -> tuple:
+    """
+    returns the lower and upper bound of the wilson score interval of
+    a rate (95% confidence for the default z).
+    """
+    if trials == 0:
+        return (0.0, 1.0)
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    margin = z * sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return (max(0.0, center - margin), min(1.0, center + margin))
+
+
+def getImbalance(stats: dict) -> float:
+    """
+    the difference between the win rates of white and black plus the rate of unfinished
+    games. A balanced table gives both players the same chances and finishes its games.
+    """
+    return (abs(stats['white'] - stats['black']) + stats['unfinished']) / stats['games']
+
+
+def mutate(values: dict, rng: Random) -> dict:
+    """
+    returns a copy of the 'values' with a single health- or damage value scaled randomly.
+    """
+    candidate = dict(values)
+    pieceChar = rng.choice(TUNED_PIECES)
+    health, damage = candidate[pieceChar]
+    factor = rng.uniform(*MUTATION_RANGE)
+    if rng.random() < 0.5:
+        health = min(max(round(health * factor), RANDOM_VALUE_RANGE[0]), RANDOM_VALUE_RANGE[1])
+    else:
+        damage = min(max(round(damage * factor), RANDOM_VALUE_RANGE[0]), RANDOM_VALUE_RANGE[1])
+    candidate[pieceChar] = (health, damage)
+    return candidate
+
+
+def evaluateValues(pool: Pool, chunksize: int, values: dict, games: int, white: str, black: str,
+                   seed: int, maxPlies: int) -> dict:
+    """
+    play 'games' games with the health- and damage 'values' on the 'pool'.
+    Every candidate is played with the same seeds, which makes them comparable with fewer games.
+    Returns the outcome statistics.
+    """
+    jobs = [(game, seed + game, white, black, maxPlies, values) for game in range(games)]
+    stats = {'games': games, 'white': 0, 'black': 0, 'draw': 0, 'unfinished': 0, 'plies': 0}
+    for result in pool.imap_unordered(playGameJob, jobs, chunksize):
+        stats['plies'] += result['plies']
+        if result['outcome'] == Outcome.WHITE_WON:
+            stats['white'] += 1
+        elif result['outcome'] == Outcome.BLACK_WON:
+            stats['black'] += 1
+        elif result['outcome'] in (Outcome.STALEMATE, Outcome.DRAW, Outcome.DRAW_REPITITION):
+            stats['draw'] += 1
+        else:
+            stats['unfinished'] += 1
+    return stats
+
+
+def printStats(name: str, stats: dict) -> None:
+    """
+    print the win rates of a candidate with their confidence intervals.
+    """
+    games = stats['games']
+    print(f"{name}: imbalance {getImbalance(stats):.3f}, {stats['plies'] / games:.1f} plies/game")
+    for key in ('white', 'black', 'draw', 'unfinished'):
+        low, high = wilsonInterval(stats[key], games)
+        print(f"{key:>12}: {stats[key] / games:6.1%}  [{low:6.1%}, {high:6.1%}]")
+
+
+def tune(candidates: int, games: int, white: str, black: str, processes: int,
+         seed: int, maxPlies: int, resultsFile: str) -> dict:
+    """
+    search the health- and damage values with the least imbalance (see getImbalance)
+    by mutating the best values found so far 'candidates' times. Each candidate plays
+    'games' self-play games on a pool of 'processes' worker processes and its statistics
+    are appended to the 'resultsFile'.
+    Returns the best values.
+    """
+    rng = Random(seed)
+    start = perf_counter()
+    totalGames = 0
+    processes = max(processes, 1)
+    # hand out the games in a few chunks per process, to reduce the overhead
+    chunksize = max(1, games // (8 * processes))
+    with Pool(processes, initializer=applySettings, initargs=(getSettings(),)) as pool, \
+            open(resultsFile, 'a', encoding='utf-8') as results:
+        best, bestStats = None, None
+        # the default values are evaluated first (candidate -1)
+        for candidateIndex in range(-1, candidates):
+            values = mutate(best, rng) if best else getDefaultValues()
+            stats = evaluateValues(pool, chunksize, values, games, white, black, seed, maxPlies)
+            totalGames += games
+            results.write(json.dumps({'candidate': candidateIndex, 'values': values,
+                                      'imbalance': getImbalance(stats), **stats}) + '\n')
+            results.flush()
+            if best is None:
+                best, bestStats = values, stats
+                printStats('default values', stats)
+            elif getImbalance(stats) < getImbalance(bestStats):
+                best, bestStats = values, stats
+                printStats(f"candidate {candidateIndex}", stats)
+    duration = perf_counter() - start
+    print(f"{totalGames} games in {duration:.2f}s: {totalGames / duration:.2f} games/s")
+    printStats('best values', bestStats)
+    printValueStatistic(best)
+    return best
+
+
+def mainTuner() -> None:
+    """
+    run the tuner requested by the command line arguments.
+    """
+    if argparser.DEFAULT_MODE:
+        print('\x1b[31mThe default variant does not use any health- or damage values.\x1b[0m')
+        return
+    tune(argparser.TUNE_CANDIDATES, argparser.TUNE_GAMES, argparser.WHITE_POLICY, argparser.BLACK_POLICY,
+         argparser.PROCESSES, argparser.SEED, argparser.MAX_PLIES, argparser.RESULTS_FILE)
@@ -0,0 +1,71 @@
+import threading
+import pygame
+
+
+# posted when a job of the EngineWorker is done (see EngineWorker.finish)
+ENGINE_DONE = pygame.event.custom_type()
+
+
+class EngineWorker:
+    def __init__(self):
+        """
+        runs expensive engine calls on a background thread, such that the gui
+        keeps handling events and rendering at its fps. Only one job runs at a time.
+        While a job is pending the gameState belongs to the worker, and the gui
+        must not read or change it.
+        """
+        self.thread = None
+        self.job = 0
+        self.stop = threading.Event()
+        self.callback = None
+
+    def busy(self) -> bool:
+        """
+        checks whether a job is pending, i.e. running or waiting
+        for its result to be handled.
+        """
+        return self.callback is not None
+
+    def start(self, function, args: tuple, callback) -> None:
+        """
+        run 'function(*args, stop)' on a background thread. 'stop' is a threading.Event
+        which is set if the job is cancelled. Its result is passed to 'callback' on the
+        main thread, once the ENGINE_DONE event is handled (see finish).
+        """
+        self.cancel()
+        self.job += 1
+        self.stop = threading.Event()
+        self.callback = callback
+        self.thread = threading.Thread(target=self._run, args=(self.job, self.stop, function, args), daemon=True)
+        self.thread.start()
+
+    def _run(self, job: int, stop: threading.Event, function, args: tuple) -> None:
+        try:
+            result = function(*args, stop)
+        except BaseException as exc:
+            # raised again on the main thread (see finish)
+            result = exc
+        if not stop.is_set():
+            pygame.event.post(pygame.event.Event(ENGINE_DONE, job=job, result=result))
+
+    def finish(self, event: pygame.event.Event, *args):
+        """
+        handle an ENGINE_DONE event and return the value of 'callback(*args, result)'.
+        Events of cancelled jobs are ignored.
+        """
+        if event.job != self.job or self.callback is None:
+            return None
+        callback, self.callback = self.callback, None
+        if isinstance(event.result, BaseException):
+            raise event.result
+        return callback(*args, event.result)
+
+    def cancel(self) -> None:
+        """
+        cancel the pending job and wait until it does not touch the gameState anymore.
+        Its result is dropped.
+        """
+        if self.thread is not None and self.thread.is_alive():
+            self.stop.set()
+            self.thread.join()
+        self.callback = None
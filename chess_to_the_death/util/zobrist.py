@@ -0,0 +1,53 @@
+from random import Random
+
+from chess_to_the_death.util.definition import PieceChar, pieceTranslateDic
+
+
+# the keys are generated with a fixed seed, so a position always
+# has the same hash (e.g. across processes)
+ZOBRIST_SEED = 0x5EED
+# pieces with these types keep their castling- or double-step rights
+# as long as they have not moved
+RIGHTS_PIECES = [PieceChar.KING, PieceChar.ROOK, PieceChar.PAWN]
+
+# the keys only depend on the board dimension, so every
+# GameState of the same size shares them.
+_ZOBRIST_KEYS = {}
+
+
+class ZobristKeys:
+    def __init__(self, dimension: tuple):
+        """
+        generate the random 64bit keys for a board with the shape 'dimension' (height, width).
+        The cells are indexed like the bitboards (y * width + x).
+        """
+        self._random = Random(ZOBRIST_SEED)
+        self.height, self.width = dimension
+        size = self.height * self.width
+        pieceIDs = len(pieceTranslateDic) // 2
+        # pieces[idx][pieceID] with negative pieceIDs for black pieces
+        self.pieces = [[self._random.getrandbits(64) for _ in range(2 * pieceIDs)] for _ in range(size)]
+        self.unmoved = [self._random.getrandbits(64) for _ in range(size)]
+        self.en_passant = [self._random.getrandbits(64) for _ in range(self.width)]
+        self.black_turn = self._random.getrandbits(64)
+        self._health = {}
+
+    def health(self, idx: int, health: int) -> int:
+        """
+        return the key of a piece with 'health' healthpoints on the cell 'idx'.
+        The keys are generated the first time they are needed, seeded by
+        the cell and health so they do not depend on the order of requests.
+        """
+        if (idx, health) not in self._health:
+            seed = (ZOBRIST_SEED * 1000003 + idx) * 1000003 + health
+            self._health[(idx, health)] = Random(seed).getrandbits(64)
+        return self._health[(idx, health)]
+
+
+def getZobristKeys(dimension: tuple) -> ZobristKeys:
+    """
+    return the (cached) ZobristKeys for the board dimension (height, width).
+    """
+    if dimension not in _ZOBRIST_KEYS:
+        _ZOBRIST_KEYS[dimension] = ZobristKeys(dimension)
+    return _ZOBRIST_KEYS[dimension]